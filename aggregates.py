@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Agrégations des onglets du dashboard, regroupées par onglet. Ces fonctions sont pures
+# (elles ne touchent pas à Streamlit) : le dashboard les met en cache par état de filtre.
+
+YOUNG_AGE_LIMIT = 21
+
+CORRELATION_COLUMNS = ['Performance Buts', 'Performance Passes', 'Minutes par Match', 'Matchs Joués', 'Âge']
+
+
+def _counts(series, label):
+    counts = series.value_counts()
+    counts = counts[counts > 0].reset_index()
+    counts.columns = [label, 'Nombre']
+    return counts
+
+
+def overview_aggregates(df):
+    position_counts = _counts(df['Position'], 'Position').sort_values('Nombre', ascending=True)
+
+    age_category = pd.Series(
+        np.where(df['Âge'] < YOUNG_AGE_LIMIT, 'Moins de 21 ans', '21 ans et plus'),
+        index=df.index,
+        name='Catégorie'
+    )
+    age_counts = _counts(age_category, 'Catégorie')
+    age_counts['Pourcentage'] = (age_counts['Nombre'] / age_counts['Nombre'].sum() * 100).round(1)
+    league_age_detail = (
+        pd.DataFrame({'Ligue': df['Ligue'], 'Catégorie': age_category})
+        .groupby(['Ligue', 'Catégorie'], observed=True)
+        .size()
+        .reset_index(name='Nombre')
+    )
+
+    return {
+        'position_counts': position_counts,
+        'league_counts': _counts(df['Ligue'], 'Ligue'),
+        'top_nations': _counts(df['Nationalité'], 'Nationalité').head(10),
+        'nations': df['Nationalité'].nunique(),
+        'teams': df['Équipe'].nunique(),
+        'leagues': df['Ligue'].nunique(),
+        'positions': df['Position'].nunique(),
+        'age_counts': age_counts,
+        'league_age_detail': league_age_detail,
+        'goals_performance_mean': df['Performance Buts'].mean(),
+        'assists_performance_mean': df['Performance Passes'].mean(),
+        'minutes_per_match_mean': df['Minutes par Match'].mean()
+    }
+
+
+def performance_aggregates(df):
+    position_performance = df.groupby('Position', observed=True).agg({
+        'Performance Buts': 'mean',
+        'Performance Passes': 'mean'
+    }).reset_index()
+
+    age_performance = df.groupby('Âge', observed=False).agg({
+        'Performance Buts': 'mean',
+        'Performance Passes': 'mean',
+        'Joueur': 'count'
+    }).reset_index()
+    age_performance.columns = ['Âge', 'Performance Buts Moyenne', 'Performance Passes Moyenne', 'Nombre Joueurs']
+    # Filtrer les âges avec au moins 10 joueurs pour éviter les outliers
+    age_performance = age_performance[age_performance['Nombre Joueurs'] >= 10]
+
+    return {
+        'position_performance': position_performance,
+        'correlation': df[CORRELATION_COLUMNS].corr(),
+        'age_performance': age_performance
+    }
+
+
+def league_aggregates(df):
+    by_league = df.groupby('Ligue', observed=True)
+
+    league_totals = by_league[['Buts', 'Passes Décisives']].sum().reset_index()
+    league_totals = league_totals.sort_values('Buts', ascending=False)
+
+    league_means = by_league[['Performance Buts', 'Performance Passes']].mean().reset_index()
+    league_means = league_means.sort_values('Performance Buts', ascending=False)
+
+    positions_league = df.groupby(['Ligue', 'Position'], observed=True).size().reset_index(name='Nombre')
+
+    return {
+        'league_totals': league_totals,
+        'league_means': league_means,
+        'positions_league': positions_league
+    }
+
+
+TAB_AGGREGATES = {
+    'overview': overview_aggregates,
+    'performance': performance_aggregates,
+    'leagues': league_aggregates
+}
@@ -1,574 +1,874 @@
-import pandas as pd
-import seaborn as sns
+import argparse
+import importlib.util
+import os
 import warnings
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-
-warnings.filterwarnings('ignore')
-
-plt.style.use("seaborn-v0_8")
-sns.set(font_scale=1.1)
-
-print("=" * 80)
-print("🔵 ANALYSE DES JEUNES JOUEURS - TOP 5 LIGUES EUROPÉENNES")
-print("=" * 80)
-
-print("\n📂 Chargement des données...")
-PATH = 'top5-players24-25.csv'
-df = pd.read_csv(PATH)
-
-print(f"✅ Données chargées : {len(df)} lignes, {len(df.columns)} colonnes")
-print("\n📋 Aperçu des données :")
-print(df.head())
-
-print("\n" + "=" * 80)
-print("🧹 NETTOYAGE DES DONNÉES")
-print("=" * 80)
-
-print("\n--- Valeurs Manquantes Totales ---")
-total_missing = df.isnull().sum().sum()
-if total_missing > 0:
-    print(f"Total de valeurs manquantes : {total_missing}")
-else:
-    print("Aucune valeur manquante dans le dataset.")
-
-print("\n--- Valeurs Manquantes par Colonne ---")
-missing_per_column = df.isnull().sum()
-missing_per_column = missing_per_column[missing_per_column > 0]
-if not missing_per_column.empty:
-    print(missing_per_column)
-else:
-    print("Aucune valeur manquante par colonne.")
-
-print("\n--- Valeurs Dupliquées ---")
-total_duplicate = df.duplicated().sum()
-if total_duplicate > 0:
-    print(f"Total de valeurs dupliquées : {total_duplicate}")
-else:
-    print("Aucune valeur dupliquée dans le dataset.")
-
-print("\n--- Lignes avec Valeurs Manquantes ---")
-missing_rows = df[df['Nation'].isnull() | df['Age'].isnull() | df['Born'].isnull()][['Player', 'Squad', 'Nation', 'Age', 'Born']]
-print(missing_rows)
-
-df_cleaned = df.dropna()
-print(f"\n✅ Données nettoyées : {len(df_cleaned)} lignes restantes")
-
-print("\n--- Vérification Post-Nettoyage ---")
-missing_after = df_cleaned.isnull().sum()
-missing_after = missing_after[missing_after > 0]
-if missing_after.empty:
-    print("✅ Aucune valeur manquante après nettoyage.")
-else:
-    print(missing_after)
-
-print("\n" + "=" * 80)
-print("📊 INFORMATIONS SUR LE DATASET")
-print("=" * 80)
-
-print("\n--- Informations Générales ---")
-df_cleaned.info()
-
-print("\n--- Statistiques Descriptives ---")
-print(df_cleaned.describe())
-
-print("\n" + "=" * 80)
-print("📈 ANALYSE DE LA DISTRIBUTION D'ÂGE")
-print("=" * 80)
-
-mean_age = df_cleaned['Age'].mean()
-median_age = df_cleaned['Age'].median()
-
-print(f"\n📊 Âge moyen des joueurs : {mean_age:.2f} ans")
-print(f"📊 Âge médian des joueurs : {median_age:.2f} ans")
-
-fig = px.histogram(
-    df_cleaned,
-    x="Age",
-    nbins=20,
-    marginal="box",
-    opacity=0.75,
-    color_discrete_sequence=['dodgerblue'],
-    title="Distribution de l'Âge des Joueurs (Toutes Ligues Confondues)",
-)
-
-fig.add_hline(
-    y=mean_age,
-    line_dash="dash",
-    line_color="green",
-    annotation_text=f"Moyenne: {mean_age:.2f}",
-    annotation_position="top left"
-)
-
-fig.add_hline(
-    y=median_age,
-    line_dash="dot",
-    line_color="red",
-    annotation_text=f"Médiane: {median_age:.2f}",
-    annotation_position="top right"
-)
-
-fig.update_layout(title_x=0.5)
-fig.show()
-
-leagues = df_cleaned['Comp'].value_counts().head(5).index.tolist()
-
-fig = make_subplots(
-    rows=2, cols=3,
-    subplot_titles=leagues,
-    horizontal_spacing=0.1,
-    vertical_spacing=0.15
-)
-
-for idx, liga in enumerate(leagues):
-    row = idx // 3 + 1
-    col = idx % 3 + 1
-
-    data = df_cleaned[df_cleaned['Comp'] == liga]
-    mean_age_liga = data['Age'].mean()
-    median_age_liga = data['Age'].median()
-
-    fig.add_trace(go.Histogram(
-        x=data['Age'],
-        nbinsx=20,
-        marker_color='dodgerblue',
+
+import pandas as pd
+
+from charts import label_top_points
+from exports import EXPORT_FORMATS, export_name, write_export
+from metrics import MetricFrame, add_metrics
+from players_data import CHUNK_SIZE, PATH, load_clean, load_raw, load_seasons
+from roles import MODEL_LOAD_ERRORS, MODEL_PATH, ROLE_FEATURES, RoleModel, load_role_model, role_model
+from schema import apply_schema, memory_report
+
+# Pipeline d'analyse des jeunes joueurs : load → clean → young subset → metrics →
+# clustering → export. Les étapes ne font ni affichage ni graphique et peuvent être
+# appelées séparément (dashboard, traitements batch) ; les fonctions report_* produisent
+# les sorties console et les fonctions plot_* les figures, qui ne sont construites que
+# si une sortie de figures est demandée (voir FigureOutput). Plotly et scikit-learn ne sont
+# importés que par ces étapes : un traitement qui n'exporte que les CSV ne les charge pas
+# tant que le modèle de rôles n'est pas ajusté ou rechargé.
+
+AGE_THRESHOLD = 21
+OUTPUT_DIR = '.'
+FIGURES_DIR = 'figures'
+FIGURE_MODES = ['show', 'html', 'png', 'none']
+
+FEATURES = ROLE_FEATURES
+
+# Population sur laquelle le modèle de rôles est ajusté : les jeunes joueurs, ou tous les
+# joueurs (toutes saisons, tous âges), les jeunes étant ensuite affectés au modèle
+ROLE_POPULATIONS = ['young', 'all']
+
+# Indicateurs dérivés des jeunes joueurs (voir metrics.py)
+YOUNG_METRICS = ['starter_ratio', 'G+A']
+
+EXPORT_COLUMNS = ['Player', 'Age', 'Squad', 'Comp', 'Pos', 'Role', 'Min', 'Gls', 'Ast', 'G+A', 'xG', 'xAG', 'PrgP', 'starter_ratio']
+
+EXPORT_FILES = {
+    'players': 'analyse jeunes joueurs.csv',
+    'top': 'top 30 jeunes joueurs.csv',
+    'roles': 'statistiques roles.csv'
+}
+
+EXPORT_DESCRIPTIONS = {
+    'players': 'Tous les jeunes joueurs avec leurs rôles',
+    'top': 'Top 30 par Buts+Passes',
+    'roles': 'Statistiques par rôle'
+}
+
+
+# --- Étapes du pipeline -------------------------------------------------------
+
+def load_players(path=PATH):
+    # Un fichier CSV, ou un dossier de CSV de saisons (colonne "Season" ajoutée)
+    if os.path.isdir(path):
+        return load_seasons(path, variant='raw')
+    return load_raw(path)
+
+
+def clean_players(df):
+    # Sans valeurs manquantes, Age et Born redeviennent entiers (voir schema.py)
+    return apply_schema(df.dropna())
+
+
+def young_subset(df_cleaned, age_threshold=AGE_THRESHOLD):
+    return df_cleaned[df_cleaned['Age'] <= age_threshold].copy()
+
+
+def stream_young_players(path=PATH, age_threshold=AGE_THRESHOLD, chunksize=CHUNK_SIZE):
+    # Équivalent de young_subset(clean_players(load_players(path))) lu bloc par bloc :
+    # seuls les jeunes joueurs nettoyés de chaque bloc sont conservés
+    return load_clean(path, row_filter=lambda chunk: chunk['Age'] <= age_threshold, chunksize=chunksize).copy()
+
+
+def add_young_metrics(young_players):
+    return add_metrics(young_players, YOUNG_METRICS)
+
+
+def top_contributors(young_players, n=30):
+    return young_players.sort_values('G+A', ascending=False, kind='stable').head(n)
+
+
+def efficiency_tables(df_cleaned, age_threshold=AGE_THRESHOLD, n=10):
+    young_scorers = add_metrics(df_cleaned[(df_cleaned['Age'] <= age_threshold) & (df_cleaned['Gls'] >= 10)], ['conv_Gls_xG'])
+    top_efficient_scorers = young_scorers.sort_values('conv_Gls_xG', ascending=False).head(n)
+
+    young_assisters = add_metrics(df_cleaned[(df_cleaned['Age'] <= age_threshold) & (df_cleaned['Ast'] >= df_cleaned['Ast'].quantile(0.95))], ['conv_Ast_xAG'])
+    top_efficient_assisters = young_assisters.sort_values('conv_Ast_xAG', ascending=False).head(n)
+
+    return top_efficient_scorers, top_efficient_assisters
+
+
+def top_progressors(young_players, n=10):
+    progression = MetricFrame(young_players)['PrgP_xAG']
+    return young_players.loc[progression.sort_values(ascending=False).index[:n]].assign(PrgP_xAG=progression)
+
+
+def fit_roles(population, features=FEATURES, n_clusters=None, model_path=MODEL_PATH, refit=False):
+    # K choisi automatiquement si n_clusters est None. Le modèle sauvegardé dans model_path
+    # est rechargé si population n'a pas changé (voir roles.role_model) ; renvoie
+    # (modèle, True si rechargé)
+    return role_model(population, features, n_clusters, model_path, refit)
+
+
+def pipeline_role_model(df_cleaned, young_players, roles_on='young', n_clusters=None, model_path=MODEL_PATH,
+                        model=None, refit=False):
+    # Modèle de rôles du pipeline (run_pipeline et main) : model tel quel s'il est fourni,
+    # sinon ajusté ou rechargé sur la population choisie. Sans frame complet (lecture en
+    # streaming), sur les jeunes joueurs. Renvoie (modèle, True si réutilisé)
+    if model is not None:
+        return model, True
+    population = df_cleaned if roles_on == 'all' and df_cleaned is not None else young_players
+    return fit_roles(population, n_clusters=n_clusters, model_path=model_path, refit=refit)
+
+
+def reused_role_model(model_path=MODEL_PATH):
+    # Modèle sauvegardé pour --reuse-model ; s'il est absent ou illisible, None : le modèle
+    # est alors ajusté comme sans l'option (et sauvegardé dans model_path)
+    try:
+        model = load_role_model(model_path)
+    except MODEL_LOAD_ERRORS as error:
+        reason = error.__class__.__name__
+    else:
+        if isinstance(model, RoleModel):
+            return model
+        reason = f"objet {model.__class__.__name__}"
+    print(f"⚠️ Modèle de rôles {model_path} inutilisable ({reason}) : nouvel ajustement")
+    return None
+
+
+def cluster_roles(young_players, model):
+    # Scaler, k-means et PCA du modèle appliqués tels quels : aucun réajustement ici
+    X = model.transform(young_players)
+    young_players['RoleCluster'] = model.predict(young_players, X)
+
+    pca_result = model.project(young_players, X)
+    young_players['PC1'] = pca_result[:, 0]
+    young_players['PC2'] = pca_result[:, 1]
+
+    cluster_summary = young_players.groupby('RoleCluster')[model.features].mean().round(2)
+    cluster_summary.insert(0, 'Role', model.role_names(cluster_summary.index))
+    young_players['Role'] = model.role_names(young_players['RoleCluster'])
+
+    return young_players, cluster_summary
+
+
+def export_results(young_players, top_ga, cluster_summary, output_dir=OUTPUT_DIR, fmt='csv', names=None):
+    # names : exports à écrire parmi EXPORT_FILES (tous si None) ; fmt : voir exports.EXPORT_FORMATS
+    tables = {
+        'players': (young_players[EXPORT_COLUMNS], False),
+        'top': (top_ga, False),
+        'roles': (cluster_summary, True)
+    }
+    names = list(EXPORT_FILES) if names is None else names
+    if names:
+        os.makedirs(output_dir, exist_ok=True)
+
+    paths = {}
+    for name in names:
+        table, index = tables[name]
+        path = os.path.normpath(os.path.join(output_dir, export_name(EXPORT_FILES[name], fmt)))
+        paths[name] = write_export(table, path, fmt, index)
+    return paths
+
+
+def run_pipeline(path=PATH, age_threshold=AGE_THRESHOLD, output_dir=OUTPUT_DIR, export=True, chunksize=None,
+                 n_clusters=None, roles_on='young', model_path=MODEL_PATH, model=None, refit=False,
+                 export_format='csv', exports=None):
+    # Avec chunksize, le fichier est lu en streaming et le frame complet n'est pas conservé
+    # (le modèle de rôles est alors ajusté sur les jeunes joueurs). Un model déjà ajusté
+    # (load_role_model) est utilisé tel quel.
+    if chunksize:
+        df_cleaned = None
+        young_players = add_young_metrics(stream_young_players(path, age_threshold, chunksize))
+    else:
+        df_cleaned = clean_players(load_players(path))
+        young_players = add_young_metrics(young_subset(df_cleaned, age_threshold))
+    top_ga = top_contributors(young_players)
+    model, model_reused = pipeline_role_model(df_cleaned, young_players, roles_on, n_clusters, model_path, model, refit)
+    young_players, cluster_summary = cluster_roles(young_players, model)
+
+    results = {
+        'players': df_cleaned,
+        'young_players': young_players,
+        'top_ga': top_ga,
+        'cluster_summary': cluster_summary,
+        'model': model,
+        'model_reused': model_reused
+    }
+    if export:
+        results['paths'] = export_results(young_players, top_ga, cluster_summary, output_dir, export_format, exports)
+    return results
+
+
+# --- Rapports console et figures ----------------------------------------------
+
+class FigureOutput:
+    # Destination des figures : 'show' (navigateur), 'html' ou 'png' (fichiers écrits dans
+    # directory), 'none' (mode headless : les figures ne sont même pas construites)
+    def __init__(self, mode='show', directory=FIGURES_DIR):
+        self.mode = mode
+        self.directory = directory
+        self.written = []
+
+    @property
+    def enabled(self):
+        return self.mode != 'none'
+
+    def emit(self, fig, name):
+        if self.mode == 'show':
+            fig.show()
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.{self.mode}")
+        if self.mode == 'html':
+            fig.write_html(path, include_plotlyjs='cdn')
+        else:
+            # L'export PNG nécessite le paquet kaleido
+            fig.write_image(path)
+        self.written.append(path)
+
+
+def print_section(title):
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+
+
+def report_loading(df):
+    print(f"✅ Données chargées : {len(df)} lignes, {len(df.columns)} colonnes")
+    memory = memory_report(df)
+    print(f"💾 Mémoire : {memory['after_mb']:.2f} Mo au lieu de {memory['before_mb']:.2f} Mo sans schéma compact (-{memory['saved_pct']:.0f}%)")
+    print("\n📋 Aperçu des données :")
+    print(df.head())
+
+
+def report_cleaning(df, df_cleaned):
+    print_section("🧹 NETTOYAGE DES DONNÉES")
+
+    print("\n--- Valeurs Manquantes Totales ---")
+    total_missing = df.isnull().sum().sum()
+    if total_missing > 0:
+        print(f"Total de valeurs manquantes : {total_missing}")
+    else:
+        print("Aucune valeur manquante dans le dataset.")
+
+    print("\n--- Valeurs Manquantes par Colonne ---")
+    missing_per_column = df.isnull().sum()
+    missing_per_column = missing_per_column[missing_per_column > 0]
+    if not missing_per_column.empty:
+        print(missing_per_column)
+    else:
+        print("Aucune valeur manquante par colonne.")
+
+    print("\n--- Valeurs Dupliquées ---")
+    total_duplicate = df.duplicated().sum()
+    if total_duplicate > 0:
+        print(f"Total de valeurs dupliquées : {total_duplicate}")
+    else:
+        print("Aucune valeur dupliquée dans le dataset.")
+
+    print("\n--- Lignes avec Valeurs Manquantes ---")
+    missing_rows = df[df['Nation'].isnull() | df['Age'].isnull() | df['Born'].isnull()][['Player', 'Squad', 'Nation', 'Age', 'Born']]
+    print(missing_rows)
+
+    print(f"\n✅ Données nettoyées : {len(df_cleaned)} lignes restantes")
+
+    print("\n--- Vérification Post-Nettoyage ---")
+    missing_after = df_cleaned.isnull().sum()
+    missing_after = missing_after[missing_after > 0]
+    if missing_after.empty:
+        print("✅ Aucune valeur manquante après nettoyage.")
+    else:
+        print(missing_after)
+
+    print_section("📊 INFORMATIONS SUR LE DATASET")
+
+    print("\n--- Informations Générales ---")
+    df_cleaned.info()
+
+    print("\n--- Statistiques Descriptives ---")
+    print(df_cleaned.describe())
+
+
+def report_age_distribution(df_cleaned):
+    print_section("📈 ANALYSE DE LA DISTRIBUTION D'ÂGE")
+
+    mean_age = df_cleaned['Age'].mean()
+    median_age = df_cleaned['Age'].median()
+
+    print(f"\n📊 Âge moyen des joueurs : {mean_age:.2f} ans")
+    print(f"📊 Âge médian des joueurs : {median_age:.2f} ans")
+
+
+def plot_age_distribution(df_cleaned, figures):
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    mean_age = df_cleaned['Age'].mean()
+    median_age = df_cleaned['Age'].median()
+
+    fig = px.histogram(
+        df_cleaned,
+        x="Age",
+        nbins=20,
+        marginal="box",
         opacity=0.75,
-        name=liga,
-        showlegend=False
-    ), row=row, col=col)
-
-    fig.add_vline(
-        x=mean_age_liga, line_dash='dash', line_color='green',
-        row=row, col=col,
-        annotation_text=f"Moy: {mean_age_liga:.1f}",
-        annotation_position="top left",
-        annotation_font_size=10
+        color_discrete_sequence=['dodgerblue'],
+        title="Distribution de l'Âge des Joueurs (Toutes Ligues Confondues)",
+    )
+
+    fig.add_hline(
+        y=mean_age,
+        line_dash="dash",
+        line_color="green",
+        annotation_text=f"Moyenne: {mean_age:.2f}",
+        annotation_position="top left"
     )
 
-    fig.add_vline(
-        x=median_age_liga, line_dash='dot', line_color='red',
-        row=row, col=col,
-        annotation_text=f"Méd: {median_age_liga:.1f}",
-        annotation_position="top right",
-        annotation_font_size=10
+    fig.add_hline(
+        y=median_age,
+        line_dash="dot",
+        line_color="red",
+        annotation_text=f"Médiane: {median_age:.2f}",
+        annotation_position="top right"
     )
 
-fig.update_layout(
-    height=650,
-    width=1000,
-    title="Distribution de l'Âge des Joueurs par Ligue (Moyenne & Médiane)",
-    title_x=0.5,
-    bargap=0.05
-)
-
-fig.update_xaxes(title_text="Âge")
-fig.update_yaxes(title_text="Nombre de Joueurs")
-
-fig.show()
-
-print("\n" + "=" * 80)
-print("🏃‍♂️ ANALYSE DES JEUNES JOUEURS")
-print("=" * 80)
-
-age_threshold = 21
-young_players = df_cleaned[df_cleaned['Age'] <= age_threshold].copy()
-
-print(f"\n🎯 Seuil d'âge : ≤ {age_threshold} ans")
-print(f"👥 Nombre de jeunes joueurs : {len(young_players)}")
-print(f"📊 Pourcentage du dataset : {len(young_players)/len(df_cleaned)*100:.2f}%")
-
-young_players_per_liga = young_players['Comp'].value_counts().head(5)
-print(f"\n📋 Jeunes joueurs par ligue :")
-print(young_players_per_liga)
-
-young_players_per_comp = young_players['Comp'].value_counts().head(5).reset_index()
-young_players_per_comp.columns = ['Comp', 'Number of Young Players']
-
-fig = px.bar(
-    young_players_per_comp,
-    x='Number of Young Players',
-    y='Comp',
-    orientation='h',
-    color='Number of Young Players',
-    color_continuous_scale='YlGnBu',
-    title=f'Nombre de Jeunes Joueurs par Ligue (< {age_threshold} ans)'
-)
-
-fig.update_layout(
-    xaxis_title="Nombre de Jeunes Joueurs",
-    yaxis_title="Ligue",
-    yaxis=dict(autorange='reversed'),
-    title_x=0.5
-)
-
-fig.show()
-
-young_players_per_club = young_players['Squad'].value_counts().head(10).reset_index()
-young_players_per_club.columns = ['Squad', 'Number of Young Players']
-
-fig = px.bar(
-    young_players_per_club,
-    x='Number of Young Players',
-    y='Squad',
-    orientation='h',
-    color='Number of Young Players',
-    color_continuous_scale='viridis',
-    title=f'Top 10 Clubs avec le Plus de Jeunes Joueurs (< {age_threshold} ans)'
-)
-
-fig.update_layout(
-    xaxis_title="Nombre de Jeunes Joueurs",
-    yaxis_title="Club",
-    yaxis=dict(autorange='reversed'),
-    title_x=0.5
-)
-
-fig.show()
-
-total_per_club = df_cleaned['Squad'].value_counts().reset_index()
-total_per_club.columns = ['Squad', 'Total Players']
-
-young_per_club = young_players['Squad'].value_counts().reset_index()
-young_per_club.columns = ['Squad', 'Young Players']
-
-proportion_df = pd.merge(total_per_club, young_per_club, on='Squad', how='left')
-proportion_df['Young Players'] = proportion_df['Young Players'].fillna(0)
-proportion_df['Young Proportion (%)'] = 100 * proportion_df['Young Players'] / proportion_df['Total Players']
-
-top_proportion = proportion_df.sort_values('Young Proportion (%)', ascending=False).head(10)
-
-fig = px.bar(
-    top_proportion,
-    x='Young Proportion (%)',
-    y='Squad',
-    orientation='h',
-    color='Young Proportion (%)',
-    color_continuous_scale='sunsetdark',
-    title='Top 10 Clubs avec la Plus Haute Proportion de Jeunes Joueurs'
-)
-
-fig.update_layout(
-    xaxis_title="Proportion de Jeunes Joueurs (%)",
-    yaxis_title="Club",
-    yaxis=dict(autorange='reversed'),
-    title_x=0.5
-)
-
-fig.show()
-
-print("\n" + "=" * 80)
-print("⏱️ ANALYSE DES MINUTES ET TITULARISATIONS")
-print("=" * 80)
-
-avg_minutes_young = young_players['Min'].mean()
-print(f"\n⏱️ Minutes moyennes pour les jeunes joueurs : {avg_minutes_young:.2f} minutes")
-
-avg_min_per_league = young_players.groupby('Comp')['Min'].mean().round(2).sort_values(ascending=False)
-print(f"\n📊 Minutes moyennes par ligue :")
-print(avg_min_per_league)
-
-fig = px.bar(
-    avg_min_per_league.reset_index(),
-    x='Min',
-    y='Comp',
-    orientation='h',
-    text='Min',
-    color='Min',
-    color_continuous_scale='Emrld',
-    title='Minutes Moyennes Jouées par les Jeunes Joueurs par Ligue'
-)
-
-fig.update_layout(
-    yaxis=dict(title='Ligue'),
-    xaxis=dict(title='Minutes Moyennes'),
-    yaxis_autorange='reversed',
-    title_x=0.5
-)
-
-fig.show()
-
-top_10_min_young = young_players[['Player', 'Min', 'Age', 'Squad', 'Comp']].sort_values('Min', ascending=False).head(10).reset_index(drop=True)
-
-print(f"\n🏆 Top 10 Jeunes Joueurs avec le Plus de Minutes :")
-print(top_10_min_young)
-
-fig = px.bar(
-    top_10_min_young,
-    x='Min',
-    y='Player',
-    orientation='h',
-    color='Min',
-    color_continuous_scale='bupu',
-    text='Min',
-    title='Top 10 Jeunes Joueurs avec le Plus de Minutes Jouées'
-)
-fig.update_layout(yaxis=dict(autorange='reversed'), title_x=0.5)
-fig.show()
-
-young_players['starter_ratio'] = young_players['Starts'] / young_players['MP']
-young_players_filtered = young_players[young_players['MP'] >= 20]
-top_starter = young_players_filtered.sort_values(['starter_ratio', 'MP'], ascending=False).head(10)
-
-fig = px.bar(
-    top_starter,
-    x='Player',
-    y='starter_ratio',
-    color='starter_ratio',
-    color_continuous_scale='viridis',
-    title='Ratio de Titularisation des Jeunes Joueurs (Minimum 20 Apparitions)',
-    labels={'starter_ratio': 'Ratio de Titularisation'},
-    hover_data=['Squad', 'MP', 'Starts', '90s']
-)
-fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
-fig.update_layout(title_x=0.5)
-fig.show()
-
-print("\n" + "=" * 80)
-print("⚽ ANALYSE DE LA PERFORMANCE OFFENSIVE")
-print("=" * 80)
-
-total_goals = df_cleaned['Gls'].sum()
-total_assists = df_cleaned['Ast'].sum()
-total_ga = df_cleaned['Gls'].add(df_cleaned['Ast']).sum()
-
-young_goals = young_players['Gls'].sum()
-young_assists = young_players['Ast'].sum()
-young_ga = young_players['Gls'].add(young_players['Ast']).sum()
-
-percent_goals = 100 * young_goals / total_goals
-percent_assists = 100 * young_assists / total_assists
-percent_ga = 100 * young_ga / total_ga
-
-print(f"\n🎯 Contribution des jeunes joueurs (≤ {age_threshold} ans) :")
-print(f"   - Buts : {young_goals} sur {total_goals} ({percent_goals:.2f}%)")
-print(f"   - Passes : {young_assists} sur {total_assists} ({percent_assists:.2f}%)")
-print(f"   - Total G+A : {young_ga} sur {total_ga} ({percent_ga:.2f}%)")
-
-top_scorers = young_players.sort_values('Gls', ascending=False).head(10)
-print(f"\n🥇 Top 10 Jeunes Buteurs :")
-print(top_scorers[['Player', 'Squad', 'Age', 'Gls', 'G-PK', 'PK', 'Min']])
-
-top_assisters = young_players.sort_values('Ast', ascending=False).head(10)
-print(f"\n🎯 Top 10 Jeunes Passeurs :")
-print(top_assisters[['Player', 'Squad', 'Age', 'Ast', 'xAG', 'Min']])
-
-young_players['G+A'] = young_players['Gls'] + young_players['Ast']
-top_ga = young_players.sort_values('G+A', ascending=False).head(30)
-
-fig = px.bar(
-    top_ga,
-    x='G+A',
-    y='Player',
-    orientation='h',
-    text='G+A',
-    color='G+A',
-    color_continuous_scale='viridis',
-    hover_data={
-        'Player': True,
-        'Gls': True,
-        'Ast': True,
-        'G+A': True,
-        'Age': True,
-        'Squad': True,
-        'Comp': True
-    },
-    title=f'Classement des Jeunes Joueurs (≤ {age_threshold} ans) par G+A'
-)
-
-fig.update_layout(
-    yaxis=dict(autorange='reversed'),
-    xaxis_title="Buts + Passes",
-    yaxis_title="Joueur",
-    title_x=0.5,
-    height=800
-)
-
-fig.show()
-
-print("\n" + "=" * 80)
-print("🧿 ANALYSE DE L'EFFICACITÉ")
-print("=" * 80)
-
-young_scorers = df_cleaned[(df_cleaned['Age'] <= age_threshold) & (df_cleaned['Gls'] >= 10)].copy()
-young_scorers['conv_Gls_xG'] = young_scorers['Gls'] / young_scorers['xG']
-top_efficient_scorers = young_scorers.sort_values('conv_Gls_xG', ascending=False).head(10)
-
-print(f"\n🎯 Top 10 Buteurs les Plus Efficaces (Ratio Buts/xG) :")
-print(top_efficient_scorers[['Player', 'Squad', 'Gls', 'xG', 'conv_Gls_xG']])
-
-young_assisters = df_cleaned[(df_cleaned['Age'] <= age_threshold) & (df_cleaned['Ast'] >= df_cleaned['Ast'].quantile(0.95))].copy()
-young_assisters['conv_Ast_xAG'] = young_assisters['Ast'] / young_assisters['xAG']
-top_efficient_assisters = young_assisters.sort_values('conv_Ast_xAG', ascending=False).head(10)
-
-print(f"\n🎯 Top 10 Passeurs les Plus Efficaces (Ratio Passes/xAG) :")
-print(top_efficient_assisters[['Player', 'Squad', 'Ast', 'xAG', 'conv_Ast_xAG']])
-
-print("\n" + "=" * 80)
-print("♟ ANALYSE DES POSITIONS")
-print("=" * 80)
-
-young_pos_counts = young_players['Pos'].value_counts().reset_index()
-young_pos_counts.columns = ['Position', 'Number of Players']
-
-print(f"\n📊 Distribution des Jeunes Joueurs par Position :")
-print(young_pos_counts)
-
-fig = px.bar(
-    young_pos_counts,
-    x='Number of Players',
-    y='Position',
-    orientation='h',
-    text='Number of Players',
-    color='Number of Players',
-    color_continuous_scale='matter',
-    title='Nombre de Jeunes Joueurs par Position'
-)
-
-fig.update_layout(
-    yaxis=dict(categoryorder='total ascending'),
-    title_x=0.5
-)
-
-fig.show()
-
-avg_min_per_pos = young_players.groupby('Pos')['Min'].mean().round(2).sort_values(ascending=False).reset_index()
-avg_min_per_pos.columns = ['Position', 'Average Minutes']
-print(f"\n⏱️ Minutes Moyennes par Position :")
-print(avg_min_per_pos)
-
-print("\n" + "=" * 80)
-print("🕹 ANALYSE DES PASSES PROGRESSIVES")
-print("=" * 80)
-
-top_passes_progressive = young_players[['Player', 'Squad', 'Comp', 'Age', 'PrgP', 'xAG', 'Ast']].sort_values('PrgP', ascending=False).head(10)
-
-print(f"\n🏆 Top 10 Jeunes Joueurs par Passes Progressives :")
-print(top_passes_progressive)
-
-fig = px.bar(
-    top_passes_progressive.reset_index(),
-    x='Player',
-    y='PrgP',
-    hover_data=['Squad', 'Age', 'Ast', 'PrgP', 'xAG'],
-    title='Top 10 Jeunes Joueurs par Passes Progressives (PrgP)',
-    color='PrgP',
-    color_continuous_scale='tropic'
-)
-fig.update_layout(title_x=0.5)
-fig.show()
-
-young_players['PrgP_xAG'] = young_players['PrgP'] + young_players['xAG']
-top_progressors = young_players.sort_values('PrgP_xAG', ascending=False).head(10)
-top_progressors_players = top_progressors['Player'].tolist()
-
-fig = px.scatter(
-    young_players,
-    x='PrgP',
-    y='xAG',
-    color='Ast',
-    size='Ast',
-    hover_data=['Player', 'Squad', 'Age'],
-    title='Relation entre Passes Progressives et xAG (Taille & Couleur: Passes Décisives)',
-    color_continuous_scale='Viridis'
-)
-
-for index, row in young_players.iterrows():
-    if row['Player'] in top_progressors_players:
-        fig.add_annotation(
-            x=row['PrgP'],
-            y=row['xAG'],
-            text=row['Player'],
-            showarrow=False,
-            yshift=10,
-            xshift=0,
-            font=dict(size=8, color="black")
+    fig.update_layout(title_x=0.5)
+    figures.emit(fig, 'age_distribution')
+
+    leagues = df_cleaned['Comp'].value_counts().head(5).index.tolist()
+
+    fig = make_subplots(
+        rows=2, cols=3,
+        subplot_titles=leagues,
+        horizontal_spacing=0.1,
+        vertical_spacing=0.15
+    )
+
+    for idx, liga in enumerate(leagues):
+        row = idx // 3 + 1
+        col = idx % 3 + 1
+
+        data = df_cleaned[df_cleaned['Comp'] == liga]
+        mean_age_liga = data['Age'].mean()
+        median_age_liga = data['Age'].median()
+
+        fig.add_trace(go.Histogram(
+            x=data['Age'],
+            nbinsx=20,
+            marker_color='dodgerblue',
+            opacity=0.75,
+            name=liga,
+            showlegend=False
+        ), row=row, col=col)
+
+        fig.add_vline(
+            x=mean_age_liga, line_dash='dash', line_color='green',
+            row=row, col=col,
+            annotation_text=f"Moy: {mean_age_liga:.1f}",
+            annotation_position="top left",
+            annotation_font_size=10
         )
 
-fig.update_layout(title_x=0.5)
-fig.show()
+        fig.add_vline(
+            x=median_age_liga, line_dash='dot', line_color='red',
+            row=row, col=col,
+            annotation_text=f"Méd: {median_age_liga:.1f}",
+            annotation_position="top right",
+            annotation_font_size=10
+        )
 
-print("\n" + "=" * 80)
-print("🎯 CLUSTERING DES RÔLES DE JOUEURS")
-print("=" * 80)
+    fig.update_layout(
+        height=650,
+        width=1000,
+        title="Distribution de l'Âge des Joueurs par Ligue (Moyenne & Médiane)",
+        title_x=0.5,
+        bargap=0.05
+    )
 
-features = ['Gls', 'G-PK', 'xG', 'Ast', 'xAG', 'PrgP', 'CrdY', 'Min']
+    fig.update_xaxes(title_text="Âge")
+    fig.update_yaxes(title_text="Nombre de Joueurs")
 
-X = young_players[features].fillna(0)
+    figures.emit(fig, 'age_distribution_by_league')
 
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
 
-kmeans = KMeans(n_clusters=3, random_state=42)
-young_players['RoleCluster'] = kmeans.fit_predict(X_scaled)
+def report_young_players(df_cleaned, young_players, age_threshold):
+    print_section("🏃‍♂️ ANALYSE DES JEUNES JOUEURS")
 
-pca = PCA(n_components=2)
-pca_result = pca.fit_transform(X_scaled)
-young_players['PC1'] = pca_result[:, 0]
-young_players['PC2'] = pca_result[:, 1]
+    print(f"\n🎯 Seuil d'âge : ≤ {age_threshold} ans")
+    print(f"👥 Nombre de jeunes joueurs : {len(young_players)}")
+    print(f"📊 Pourcentage du dataset : {len(young_players)/len(df_cleaned)*100:.2f}%")
 
-cluster_summary = young_players.groupby('RoleCluster')[features].mean().round(2)
-print("\n📊 Statistiques Moyennes par Cluster :")
-print(cluster_summary)
+    young_players_per_liga = young_players['Comp'].value_counts().head(5)
+    print(f"\n📋 Jeunes joueurs par ligue :")
+    print(young_players_per_liga)
+
+
+def plot_young_players(df_cleaned, young_players, age_threshold, figures):
+    import plotly.express as px
+
+    young_players_per_comp = young_players['Comp'].value_counts().head(5).reset_index()
+    young_players_per_comp.columns = ['Comp', 'Number of Young Players']
+
+    fig = px.bar(
+        young_players_per_comp,
+        x='Number of Young Players',
+        y='Comp',
+        orientation='h',
+        color='Number of Young Players',
+        color_continuous_scale='YlGnBu',
+        title=f'Nombre de Jeunes Joueurs par Ligue (< {age_threshold} ans)'
+    )
+
+    fig.update_layout(
+        xaxis_title="Nombre de Jeunes Joueurs",
+        yaxis_title="Ligue",
+        yaxis=dict(autorange='reversed'),
+        title_x=0.5
+    )
+
+    figures.emit(fig, 'young_players_by_league')
+
+    young_players_per_club = young_players['Squad'].value_counts().head(10).reset_index()
+    young_players_per_club.columns = ['Squad', 'Number of Young Players']
+
+    fig = px.bar(
+        young_players_per_club,
+        x='Number of Young Players',
+        y='Squad',
+        orientation='h',
+        color='Number of Young Players',
+        color_continuous_scale='viridis',
+        title=f'Top 10 Clubs avec le Plus de Jeunes Joueurs (< {age_threshold} ans)'
+    )
+
+    fig.update_layout(
+        xaxis_title="Nombre de Jeunes Joueurs",
+        yaxis_title="Club",
+        yaxis=dict(autorange='reversed'),
+        title_x=0.5
+    )
+
+    figures.emit(fig, 'young_players_by_club')
+
+    total_per_club = df_cleaned['Squad'].value_counts().reset_index()
+    total_per_club.columns = ['Squad', 'Total Players']
+
+    young_per_club = young_players['Squad'].value_counts().reset_index()
+    young_per_club.columns = ['Squad', 'Young Players']
+
+    proportion_df = pd.merge(total_per_club, young_per_club, on='Squad', how='left')
+    proportion_df['Young Players'] = proportion_df['Young Players'].fillna(0)
+    proportion_df['Young Proportion (%)'] = 100 * proportion_df['Young Players'] / proportion_df['Total Players']
+
+    top_proportion = proportion_df.sort_values('Young Proportion (%)', ascending=False).head(10)
+
+    fig = px.bar(
+        top_proportion,
+        x='Young Proportion (%)',
+        y='Squad',
+        orientation='h',
+        color='Young Proportion (%)',
+        color_continuous_scale='sunsetdark',
+        title='Top 10 Clubs avec la Plus Haute Proportion de Jeunes Joueurs'
+    )
+
+    fig.update_layout(
+        xaxis_title="Proportion de Jeunes Joueurs (%)",
+        yaxis_title="Club",
+        yaxis=dict(autorange='reversed'),
+        title_x=0.5
+    )
+
+    figures.emit(fig, 'young_proportion_by_club')
+
+
+def report_minutes(young_players):
+    print_section("⏱️ ANALYSE DES MINUTES ET TITULARISATIONS")
+
+    avg_minutes_young = young_players['Min'].mean()
+    print(f"\n⏱️ Minutes moyennes pour les jeunes joueurs : {avg_minutes_young:.2f} minutes")
+
+    avg_min_per_league = young_players.groupby('Comp', observed=True)['Min'].mean().round(2).sort_values(ascending=False)
+    print(f"\n📊 Minutes moyennes par ligue :")
+    print(avg_min_per_league)
+
+    top_10_min_young = young_players[['Player', 'Min', 'Age', 'Squad', 'Comp']].sort_values('Min', ascending=False).head(10).reset_index(drop=True)
+
+    print(f"\n🏆 Top 10 Jeunes Joueurs avec le Plus de Minutes :")
+    print(top_10_min_young)
+
+
+def plot_minutes(young_players, figures):
+    import plotly.express as px
+
+    avg_min_per_league = young_players.groupby('Comp', observed=True)['Min'].mean().round(2).sort_values(ascending=False)
+
+    fig = px.bar(
+        avg_min_per_league.reset_index(),
+        x='Min',
+        y='Comp',
+        orientation='h',
+        text='Min',
+        color='Min',
+        color_continuous_scale='Emrld',
+        title='Minutes Moyennes Jouées par les Jeunes Joueurs par Ligue'
+    )
+
+    fig.update_layout(
+        yaxis=dict(title='Ligue'),
+        xaxis=dict(title='Minutes Moyennes'),
+        yaxis_autorange='reversed',
+        title_x=0.5
+    )
+
+    figures.emit(fig, 'minutes_by_league')
+
+    top_10_min_young = young_players[['Player', 'Min', 'Age', 'Squad', 'Comp']].sort_values('Min', ascending=False).head(10).reset_index(drop=True)
+
+    fig = px.bar(
+        top_10_min_young,
+        x='Min',
+        y='Player',
+        orientation='h',
+        color='Min',
+        color_continuous_scale='bupu',
+        text='Min',
+        title='Top 10 Jeunes Joueurs avec le Plus de Minutes Jouées'
+    )
+    fig.update_layout(yaxis=dict(autorange='reversed'), title_x=0.5)
+    figures.emit(fig, 'top_minutes')
+
+    young_players_filtered = young_players[young_players['MP'] >= 20]
+    top_starter = young_players_filtered.sort_values(['starter_ratio', 'MP'], ascending=False).head(10)
+
+    fig = px.bar(
+        top_starter,
+        x='Player',
+        y='starter_ratio',
+        color='starter_ratio',
+        color_continuous_scale='viridis',
+        title='Ratio de Titularisation des Jeunes Joueurs (Minimum 20 Apparitions)',
+        labels={'starter_ratio': 'Ratio de Titularisation'},
+        hover_data=['Squad', 'MP', 'Starts', '90s']
+    )
+    fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
+    fig.update_layout(title_x=0.5)
+    figures.emit(fig, 'starter_ratio')
+
+
+def report_offense(df_cleaned, young_players, top_ga, age_threshold):
+    print_section("⚽ ANALYSE DE LA PERFORMANCE OFFENSIVE")
+
+    total_goals = df_cleaned['Gls'].sum()
+    total_assists = df_cleaned['Ast'].sum()
+    total_ga = df_cleaned['Gls'].add(df_cleaned['Ast']).sum()
+
+    young_goals = young_players['Gls'].sum()
+    young_assists = young_players['Ast'].sum()
+    young_ga = young_players['Gls'].add(young_players['Ast']).sum()
+
+    percent_goals = 100 * young_goals / total_goals
+    percent_assists = 100 * young_assists / total_assists
+    percent_ga = 100 * young_ga / total_ga
+
+    print(f"\n🎯 Contribution des jeunes joueurs (≤ {age_threshold} ans) :")
+    print(f"   - Buts : {young_goals} sur {total_goals} ({percent_goals:.2f}%)")
+    print(f"   - Passes : {young_assists} sur {total_assists} ({percent_assists:.2f}%)")
+    print(f"   - Total G+A : {young_ga} sur {total_ga} ({percent_ga:.2f}%)")
+
+    top_scorers = young_players.sort_values('Gls', ascending=False).head(10)
+    print(f"\n🥇 Top 10 Jeunes Buteurs :")
+    print(top_scorers[['Player', 'Squad', 'Age', 'Gls', 'G-PK', 'PK', 'Min']])
+
+    top_assisters = young_players.sort_values('Ast', ascending=False).head(10)
+    print(f"\n🎯 Top 10 Jeunes Passeurs :")
+    print(top_assisters[['Player', 'Squad', 'Age', 'Ast', 'xAG', 'Min']])
+
+
+def plot_offense(top_ga, age_threshold, figures):
+    import plotly.express as px
+
+    fig = px.bar(
+        top_ga,
+        x='G+A',
+        y='Player',
+        orientation='h',
+        text='G+A',
+        color='G+A',
+        color_continuous_scale='viridis',
+        hover_data={
+            'Player': True,
+            'Gls': True,
+            'Ast': True,
+            'G+A': True,
+            'Age': True,
+            'Squad': True,
+            'Comp': True
+        },
+        title=f'Classement des Jeunes Joueurs (≤ {age_threshold} ans) par G+A'
+    )
+
+    fig.update_layout(
+        yaxis=dict(autorange='reversed'),
+        xaxis_title="Buts + Passes",
+        yaxis_title="Joueur",
+        title_x=0.5,
+        height=800
+    )
+
+    figures.emit(fig, 'top_goals_assists')
+
+
+def report_efficiency(df_cleaned, age_threshold):
+    print_section("🧿 ANALYSE DE L'EFFICACITÉ")
+
+    top_efficient_scorers, top_efficient_assisters = efficiency_tables(df_cleaned, age_threshold)
+
+    print(f"\n🎯 Top 10 Buteurs les Plus Efficaces (Ratio Buts/xG) :")
+    print(top_efficient_scorers[['Player', 'Squad', 'Gls', 'xG', 'conv_Gls_xG']])
+
+    print(f"\n🎯 Top 10 Passeurs les Plus Efficaces (Ratio Passes/xAG) :")
+    print(top_efficient_assisters[['Player', 'Squad', 'Ast', 'xAG', 'conv_Ast_xAG']])
+
+
+def report_positions(young_players):
+    print_section("♟ ANALYSE DES POSITIONS")
+
+    young_pos_counts = young_players['Pos'].value_counts()
+    young_pos_counts = young_pos_counts[young_pos_counts > 0].reset_index()
+    young_pos_counts.columns = ['Position', 'Number of Players']
+
+    print(f"\n📊 Distribution des Jeunes Joueurs par Position :")
+    print(young_pos_counts)
+
+    avg_min_per_pos = young_players.groupby('Pos', observed=True)['Min'].mean().round(2).sort_values(ascending=False).reset_index()
+    avg_min_per_pos.columns = ['Position', 'Average Minutes']
+    print(f"\n⏱️ Minutes Moyennes par Position :")
+    print(avg_min_per_pos)
+
+
+def plot_positions(young_players, figures):
+    import plotly.express as px
+
+    young_pos_counts = young_players['Pos'].value_counts()
+    young_pos_counts = young_pos_counts[young_pos_counts > 0].reset_index()
+    young_pos_counts.columns = ['Position', 'Number of Players']
+
+    fig = px.bar(
+        young_pos_counts,
+        x='Number of Players',
+        y='Position',
+        orientation='h',
+        text='Number of Players',
+        color='Number of Players',
+        color_continuous_scale='matter',
+        title='Nombre de Jeunes Joueurs par Position'
+    )
+
+    fig.update_layout(
+        yaxis=dict(categoryorder='total ascending'),
+        title_x=0.5
+    )
+
+    figures.emit(fig, 'positions')
+
+
+def report_progression(young_players):
+    print_section("🕹 ANALYSE DES PASSES PROGRESSIVES")
+
+    top_passes_progressive = young_players[['Player', 'Squad', 'Comp', 'Age', 'PrgP', 'xAG', 'Ast']].sort_values('PrgP', ascending=False).head(10)
+
+    print(f"\n🏆 Top 10 Jeunes Joueurs par Passes Progressives :")
+    print(top_passes_progressive)
+
+
+def plot_progression(young_players, figures):
+    import plotly.express as px
+
+    top_passes_progressive = young_players[['Player', 'Squad', 'Comp', 'Age', 'PrgP', 'xAG', 'Ast']].sort_values('PrgP', ascending=False).head(10)
+
+    fig = px.bar(
+        top_passes_progressive.reset_index(),
+        x='Player',
+        y='PrgP',
+        hover_data=['Squad', 'Age', 'Ast', 'PrgP', 'xAG'],
+        title='Top 10 Jeunes Joueurs par Passes Progressives (PrgP)',
+        color='PrgP',
+        color_continuous_scale='tropic'
+    )
+    fig.update_layout(title_x=0.5)
+    figures.emit(fig, 'progressive_passes')
+
+    fig = px.scatter(
+        young_players,
+        x='PrgP',
+        y='xAG',
+        color='Ast',
+        size='Ast',
+        hover_data=['Player', 'Squad', 'Age'],
+        title='Relation entre Passes Progressives et xAG (Taille & Couleur: Passes Décisives)',
+        color_continuous_scale='Viridis'
+    )
+
+    label_top_points(fig, top_progressors(young_players), x='PrgP', y='xAG', text='Player')
+
+    fig.update_layout(title_x=0.5)
+    figures.emit(fig, 'progressive_passes_xag')
+
+
+def report_roles(young_players, cluster_summary, model, model_reused=False):
+    print_section("🎯 CLUSTERING DES RÔLES DE JOUEURS")
+
+    if model_reused:
+        print(f"\n♻️ Modèle de rôles rechargé (données {model.data_hash} inchangées, aucun réajustement)")
+    if model.k_scores is not None:
+        print(f"\n🔢 Choix du nombre de clusters (K retenu : {model.n_clusters}) :")
+        print(model.k_scores.round(3).to_string(index=False))
+
+    print("\n📊 Statistiques Moyennes par Cluster :")
+    print(cluster_summary)
+
+    print(f"\n👥 Distribution des Rôles :")
+    print(young_players['Role'].value_counts())
+
+
+def plot_roles(young_players, top_ga, figures):
+    import plotly.express as px
+
+    fig = px.scatter(
+        young_players,
+        x='PC1',
+        y='PC2',
+        color='Role',
+        hover_data=['Player', 'Squad', 'Age', 'Gls', 'Ast'],
+        title='Classification des Rôles des Jeunes Joueurs (Basée sur les Statistiques de Performance)'
+    )
+    # Repères : les 10 meilleurs contributeurs G+A sur la projection
+    label_top_points(fig, young_players.loc[top_ga.index[:10]], x='PC1', y='PC2', text='Player')
+    figures.emit(fig, 'roles_pca')
+
+    avg_stats = young_players.groupby('Role')[['Gls', 'Ast', 'xG', 'xAG']].mean().round(2).reset_index()
+
+    fig = px.bar(
+        avg_stats.melt(id_vars='Role'),
+        x='Role',
+        y='value',
+        color='variable',
+        barmode='group',
+        title='Statistiques Clés Moyennes par Rôle',
+        labels={'value': 'Moyenne', 'variable': 'Statistique'},
+        color_discrete_sequence=px.colors.sequential.Viridis
+    )
+    fig.update_layout(title_x=0.5)
+    figures.emit(fig, 'roles_stats')
+
+
+def report_exports(paths, young_players, top_ga, cluster_summary):
+    print_section("💾 EXPORT DES RÉSULTATS")
+
+    counts = {
+        'players': f"{len(young_players)} lignes",
+        'top': f"{len(top_ga)} lignes",
+        'roles': f"{len(cluster_summary)} rôles"
+    }
+    for name, path in paths.items():
+        print(f"✅ Fichier exporté : {os.path.basename(path)} ({counts[name]})")
+    if not paths:
+        print("Aucun fichier exporté (--exports sans valeur)")
+
+    print_section("✨ ANALYSE TERMINÉE !")
+    if paths:
+        print(f"\n📁 Fichiers créés :")
+    for number, (name, path) in enumerate(paths.items(), start=1):
+        print(f"   {number}. {path} - {EXPORT_DESCRIPTIONS[name]}")
+
+
+# --- Exécution en ligne de commande -------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse des jeunes joueurs des 5 grandes ligues européennes")
+    parser.add_argument('--input', default=PATH, help="Fichier CSV des joueurs ou dossier de CSV de saisons (défaut : %(default)s)")
+    parser.add_argument('--age-threshold', type=int, default=AGE_THRESHOLD, help="Âge maximum inclus (défaut : %(default)s)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Dossier des CSV exportés (défaut : %(default)s)")
+    parser.add_argument('--figures', choices=FIGURE_MODES, default='show', help="Affichage ou écriture des figures (défaut : %(default)s)")
+    parser.add_argument('--figures-dir', default=FIGURES_DIR, help="Dossier des figures en mode html/png (défaut : %(default)s)")
+    parser.add_argument('--headless', action='store_true', help="Aucune figure construite, équivalent à --figures none")
+    parser.add_argument('--chunksize', type=int, default=None, help="Lecture en streaming par blocs de N lignes : seuls les exports sont produits")
+    parser.add_argument('--export-format', choices=list(EXPORT_FORMATS), default='csv', help="Format des fichiers exportés (défaut : %(default)s)")
+    parser.add_argument('--exports', nargs='*', choices=list(EXPORT_FILES), default=list(EXPORT_FILES), help="Exports à écrire (défaut : tous ; sans valeur : aucun)")
+    parser.add_argument('--clusters', type=int, default=None, help="Nombre de rôles (défaut : choisi par silhouette)")
+    parser.add_argument('--roles-on', choices=ROLE_POPULATIONS, default='young', help="Population d'ajustement du modèle de rôles (défaut : %(default)s)")
+    parser.add_argument('--model-path', default=MODEL_PATH, help="Fichier du modèle de rôles sauvegardé (défaut : %(default)s)")
+    parser.add_argument('--reuse-model', action='store_true', help="Affecte les rôles avec le modèle sauvegardé, sans réajustement")
+    parser.add_argument('--refit', action='store_true', help="Réajuste le modèle de rôles même si les données n'ont pas changé")
+    args = parser.parse_args(argv)
+
+    # Vérifié avant le chargement : sans kaleido, l'export PNG échouerait à la première figure,
+    # avant l'écriture des exports
+    if args.figures == 'png' and not args.headless and not args.chunksize and importlib.util.find_spec('kaleido') is None:
+        parser.error("--figures png nécessite le paquet kaleido (pip install kaleido) ; utiliser --figures html sinon")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    figures = FigureOutput('none' if args.headless else args.figures, args.figures_dir)
+    model = reused_role_model(args.model_path) if args.reuse_model else None
+
+    if args.chunksize:
+        results = run_pipeline(
+            args.input, args.age_threshold, args.output_dir, chunksize=args.chunksize,
+            n_clusters=args.clusters, roles_on=args.roles_on, model_path=args.model_path, model=model,
+            refit=args.refit, export_format=args.export_format, exports=args.exports
+        )
+        report_exports(results['paths'], results['young_players'], results['top_ga'], results['cluster_summary'])
+        return
+
+    warnings.filterwarnings('ignore')
+
+    print("=" * 80)
+    print("🔵 ANALYSE DES JEUNES JOUEURS - TOP 5 LIGUES EUROPÉENNES")
+    print("=" * 80)
+
+    print("\n📂 Chargement des données...")
+    df = load_players(args.input)
+    report_loading(df)
+
+    df_cleaned = clean_players(df)
+    report_cleaning(df, df_cleaned)
+    report_age_distribution(df_cleaned)
+    if figures.enabled:
+        plot_age_distribution(df_cleaned, figures)
+
+    young_players = add_young_metrics(young_subset(df_cleaned, args.age_threshold))
+    report_young_players(df_cleaned, young_players, args.age_threshold)
+    if figures.enabled:
+        plot_young_players(df_cleaned, young_players, args.age_threshold, figures)
+    report_minutes(young_players)
+    if figures.enabled:
+        plot_minutes(young_players, figures)
+
+    top_ga = top_contributors(young_players)
+    report_offense(df_cleaned, young_players, top_ga, args.age_threshold)
+    if figures.enabled:
+        plot_offense(top_ga, args.age_threshold, figures)
+    report_efficiency(df_cleaned, args.age_threshold)
+    report_positions(young_players)
+    if figures.enabled:
+        plot_positions(young_players, figures)
+    report_progression(young_players)
+    if figures.enabled:
+        plot_progression(young_players, figures)
+
+    model, model_reused = pipeline_role_model(
+        df_cleaned, young_players, args.roles_on, args.clusters, args.model_path, model, args.refit
+    )
+    young_players, cluster_summary = cluster_roles(young_players, model)
+    report_roles(young_players, cluster_summary, model, model_reused)
+    if figures.enabled:
+        plot_roles(young_players, top_ga, figures)
+
+    paths = export_results(young_players, top_ga, cluster_summary, args.output_dir, args.export_format, args.exports)
+    report_exports(paths, young_players, top_ga, cluster_summary)
+    if figures.written:
+        print(f"\n🖼️ {len(figures.written)} figures écrites dans {figures.directory}")
 
-role_map = {
-    0: "Finisher",
-    1: "Defender",
-    2: "Playmaker"
-}
 
-young_players['Role'] = young_players['RoleCluster'].map(role_map)
-
-print(f"\n👥 Distribution des Rôles :")
-print(young_players['Role'].value_counts())
-
-fig = px.scatter(
-    young_players,
-    x='PC1',
-    y='PC2',
-    color='Role',
-    hover_data=['Player', 'Squad', 'Age', 'Gls', 'Ast'],
-    title='Classification des Rôles des Jeunes Joueurs (Basée sur les Statistiques de Performance)'
-)
-fig.show()
-
-avg_stats = young_players.groupby('Role')[['Gls', 'Ast', 'xG', 'xAG']].mean().round(2).reset_index()
-
-fig = px.bar(
-    avg_stats.melt(id_vars='Role'),
-    x='Role',
-    y='value',
-    color='variable',
-    barmode='group',
-    title='Statistiques Clés Moyennes par Rôle',
-    labels={'value': 'Moyenne', 'variable': 'Statistique'},
-    color_discrete_sequence=px.colors.sequential.Viridis
-)
-fig.update_layout(title_x=0.5)
-fig.show()
-
-print("\n" + "=" * 80)
-print("💾 EXPORT DES RÉSULTATS")
-print("=" * 80)
-
-young_players_export = young_players[['Player', 'Age', 'Squad', 'Comp', 'Pos', 'Role', 'Min', 'Gls', 'Ast', 'G+A', 'xG', 'xAG', 'PrgP', 'starter_ratio']].copy()
-young_players_export.to_csv('analyse jeunes joueurs.csv', index=False)
-print(f"✅ Fichier exporté : analyse jeunes joueurs.csv ({len(young_players_export)} lignes)")
-
-top_ga.to_csv('top 30 jeunes joueurs.csv', index=False)
-print(f"✅ Fichier exporté : top 30 jeunes joueurs.csv (30 lignes)")
-
-cluster_summary.to_csv('statistiques roles.csv')
-print(f"✅ Fichier exporté : statistiques roles.csv (3 rôles)")
-
-print("\n" + "=" * 80)
-print("✨ ANALYSE TERMINÉE !")
-print("=" * 80)
-print(f"\n📁 Fichiers créés :")
-print(f"   1. analyse jeunes joueurs.csv - Tous les jeunes joueurs avec leurs rôles")
-print(f"   2. top 30 jeunes joueurs.csv - Top 30 par Buts+Passes")
-print(f"   3. statistiques roles.csv - Statistiques par rôle")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from aggregates import TAB_AGGREGATES
+from analysis_young_players import add_young_metrics, clean_players, cluster_roles, young_subset
+from filters import FilterIndex
+from player_index import PlayerIndex
+from players_data import PATH, load_raw, load_seasons
+from rankings import RankingIndex
+from roles import fit_role_model
+from schema import memory_report
+from search import SearchIndex
+
+# Mesure des chemins coûteux du dashboard et du script d'analyse sur des jeux synthétiques
+# de 1×, 10× et 100× la taille du fichier réel (mêmes 37 colonnes) : chargement (à froid
+# et depuis le cache Arrow), filtres de la barre latérale, agrégations de chaque onglet,
+# classements, clustering des rôles et, en option, une exécution complète du dashboard.
+# Le temps d'import des modules du script d'analyse est mesuré dans un interpréteur neuf,
+# avec la liste des bibliothèques lourdes chargées au passage (aucune n'est attendue).
+# Le rapport est écrit en JSON ; chaque échelle tourne dans un dossier temporaire (cache
+# .cache compris), le dépôt n'est pas modifié.
+
+SCALES = [1, 10, 100]
+REPEAT = 5
+REPORT_PATH = os.path.join('benchmarks', 'report.json')
+RANDOM_STATE = 42
+
+# Requêtes de la barre latérale : arguments de FilterIndex.rows
+FILTER_QUERIES = {
+    'aucun filtre': {},
+    'une ligue': {'leagues': ['fr Ligue 1']},
+    'ligue + poste': {'leagues': ['fr Ligue 1'], 'positions': ['MI']},
+    'âge + matchs': {'age_range': (18, 23), 'mp_range': (10, 38)},
+    'tous les filtres': {'leagues': ['eng Premier League', 'es La Liga'], 'positions': ['AT', 'MI'], 'age_range': (18, 25), 'mp_range': (5, 38), 'min_goals': 3}
+}
+
+# Modules importés seuls, et bibliothèques qui ne doivent être chargées qu'à l'étape qui
+# s'en sert (figures, clustering)
+IMPORT_MODULES = ['analysis_young_players', 'players_data', 'roles', 'exports']
+HEAVY_MODULES = ['sklearn', 'scipy', 'plotly', 'matplotlib', 'seaborn']
+
+# Recherches du dashboard (fiche joueur et tableau), sur toutes les lignes et sur une ligue
+SEARCH_QUERIES = ['mbape', 'real madrid', 'odegard arsenal']
+
+RANKING_METRICS = ['Buts', 'Passes Décisives', 'Performance Buts plus Passes', 'Performance xG', ('Performance Buts plus Passes', 'Buts')]
+
+
+def synthetic_players(source, scale, random_state=RANDOM_STATE):
+    # Lignes tirées avec remise dans le fichier réel ; les copies d'un joueur reçoivent un
+    # nom et une année de naissance distincts pour rester des joueurs différents
+    rng = np.random.default_rng(random_state)
+    rows = rng.integers(0, len(source), len(source) * scale)
+    df = source.iloc[rows].reset_index(drop=True)
+
+    copy = pd.Series(rows).groupby(rows).cumcount().to_numpy()
+    df['Player'] = df['Player'].where(copy == 0, df['Player'] + ' ' + pd.Series(copy).astype(str))
+    df['Born'] = df['Born'] - (copy % 5)
+    df['Rk'] = np.arange(1, len(df) + 1)
+    return df[source.columns]
+
+
+def timed(fn, repeat=REPEAT):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return {
+        'median_s': round(statistics.median(durations), 6),
+        'min_s': round(min(durations), 6),
+        'runs': repeat
+    }
+
+
+def once(fn):
+    # Étapes mises en cache après le premier appel : une seule mesure
+    start = time.perf_counter()
+    result = fn()
+    duration = round(time.perf_counter() - start, 6)
+    return result, {'median_s': duration, 'min_s': duration, 'runs': 1}
+
+
+def time_dashboard():
+    # Exécution complète de dashboard.py (données et index construits, onglet par défaut rendu)
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Les caches Streamlit sont globaux au processus : vidés pour ne pas réutiliser
+    # les données de l'échelle précédente
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard.py')
+    app, cold = once(lambda: AppTest.from_file(script, default_timeout=3600).run())
+    _, rerun = once(app.run)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return {'dashboard_cold': cold, 'dashboard_rerun': rerun}
+
+
+def time_import(module, repeat=REPEAT):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "seconds = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+    )
+    directory = os.path.dirname(os.path.abspath(__file__))
+    runs = [
+        json.loads(subprocess.run([sys.executable, '-c', code], cwd=directory, capture_output=True, text=True, check=True).stdout)
+        for _ in range(repeat)
+    ]
+    durations = [run['seconds'] for run in runs]
+    return {
+        'median_s': round(statistics.median(durations), 6),
+        'min_s': round(min(durations), 6),
+        'runs': repeat,
+        'heavy_modules': runs[0]['heavy']
+    }
+
+
+def time_imports(modules=IMPORT_MODULES, repeat=REPEAT):
+    return {module: time_import(module, repeat) for module in modules}
+
+
+def bench_scale(source, scale, repeat=REPEAT, dashboard=False):
+    timings = {}
+    directory = tempfile.mkdtemp(prefix=f'soccerstats-bench-{scale}x-')
+    previous = os.getcwd()
+    try:
+        os.chdir(directory)
+        players = synthetic_players(source, scale)
+        players.to_csv(PATH, index=False)
+        file_mb = os.path.getsize(PATH) / 1024 ** 2
+
+        # Chargement : parsing du CSV puis cache Arrow memory-mappé
+        df, timings['load_cold'] = once(lambda: load_seasons('.', variant='dashboard'))
+        timings['load_cached'] = timed(lambda: load_seasons('.', variant='dashboard'), repeat)
+
+        # Requêtes mesurées sans le cache LRU de l'index (max_cached=0)
+        filter_index, timings['filter_index_build'] = once(lambda: FilterIndex(df, max_cached=0))
+        for name, query in FILTER_QUERIES.items():
+            timings[f'filtre : {name}'] = timed(lambda: filter_index.rows(**query), repeat)
+        filtered = df.iloc[filter_index.rows(**FILTER_QUERIES['une ligue'])]
+
+        for tab, aggregate in TAB_AGGREGATES.items():
+            timings[f'onglet {tab} : toutes les lignes'] = timed(lambda: aggregate(df), repeat)
+            timings[f'onglet {tab} : une ligue'] = timed(lambda: aggregate(filtered), repeat)
+
+        documents = (df['Joueur'].astype(str) + ' ' + df['Équipe'].astype(str) + ' ' + df['Ligue'].astype(str)).tolist()
+        search_index, timings['search_index_build'] = once(lambda: SearchIndex(documents))
+        league_rows = filter_index.rows(**FILTER_QUERIES['une ligue'])
+        timings['recherche : toutes les lignes'] = timed(lambda: [search_index.search(query) for query in SEARCH_QUERIES], repeat)
+        timings['recherche : une ligue'] = timed(lambda: [search_index.search(query, rows=league_rows) for query in SEARCH_QUERIES], repeat)
+
+        player_index, timings['player_index_build'] = once(lambda: PlayerIndex(df))
+        rankings, timings['rankings_build'] = once(lambda: RankingIndex(player_index.totals))
+        timings['rankings_orders'] = once(lambda: [rankings.order(metric) for metric in RANKING_METRICS])[1]
+        totals_rows = player_index.totals_rows(filter_index.rows(**FILTER_QUERIES['ligue + poste']))
+        timings['rankings_top10'] = timed(lambda: [rankings.top(metric, 10, totals_rows, min_minutes=450) for metric in RANKING_METRICS], repeat)
+
+        # Clustering du script d'analyse (ajustement sans sauvegarde du modèle)
+        young_players = add_young_metrics(young_subset(clean_players(load_raw(PATH))))
+        model, timings['roles_fit'] = once(lambda: fit_role_model(young_players))
+        timings['roles_assign_pca'] = timed(lambda: cluster_roles(young_players.copy(), model), repeat)
+
+        if dashboard:
+            timings.update(time_dashboard())
+
+        return {
+            'scale': scale,
+            'rows': len(players),
+            'young_players': len(young_players),
+            'file_mb': round(file_mb, 2),
+            'memory_mb': round(memory_report(df)['after_mb'], 2),
+            'timings': timings
+        }
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_benchmarks(path=PATH, scales=SCALES, repeat=REPEAT, dashboard=False):
+    source = pd.read_csv(path)
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': {'path': path, 'rows': len(source), 'columns': len(source.columns)},
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'imports': time_imports(repeat=repeat),
+        'scales': []
+    }
+    for scale in scales:
+        print(f"⏱️ Échelle {scale}× ({len(source) * scale} lignes)...", file=sys.stderr)
+        report['scales'].append(bench_scale(source, scale, repeat, dashboard))
+    return report
+
+
+def print_report(report):
+    print(f"{'Import':<38}{'médiane':>12}  Modules lourds chargés")
+    for module, timing in report['imports'].items():
+        print(f"{module:<38}{timing['median_s'] * 1000:>10.1f}ms  {', '.join(timing['heavy_modules']) or '-'}")
+    if not report['scales']:
+        return
+
+    print()
+    stages = list(report['scales'][0]['timings'])
+    header = f"{'Étape':<38}" + ''.join(f"{str(scale['scale']) + '×':>12}" for scale in report['scales'])
+    print(header)
+    print('-' * len(header))
+    for stage in stages:
+        cells = ''.join(f"{scale['timings'][stage]['median_s'] * 1000:>10.1f}ms" for scale in report['scales'] if stage in scale['timings'])
+        print(f"{stage:<38}{cells}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du chargement, des filtres, des agrégations et du clustering")
+    parser.add_argument('--input', default=PATH, help="CSV source des lignes synthétiques (défaut : %(default)s)")
+    parser.add_argument('--scales', type=int, nargs='*', default=SCALES, help="Multiples de la taille du fichier source (défaut : %(default)s ; sans valeur : imports seulement)")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Répétitions des mesures rapides, médiane retenue (défaut : %(default)s)")
+    parser.add_argument('--dashboard', action='store_true', help="Mesure aussi une exécution complète de dashboard.py (streamlit.testing)")
+    parser.add_argument('--output', default=REPORT_PATH, help="Rapport JSON (défaut : %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmarks(os.path.abspath(args.input), args.scales, args.repeat, args.dashboard)
+    print_report(report)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 Rapport écrit dans {args.output}")
+
+    # Code de sortie non nul si un import charge une bibliothèque lourde (régression)
+    heavy = {module: timing['heavy_modules'] for module, timing in report['imports'].items() if timing['heavy_modules']}
+    if heavy:
+        print(f"⚠️ Bibliothèques lourdes chargées à l'import : {heavy}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
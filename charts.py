@@ -0,0 +1,20 @@
+# Aides Plotly partagées entre le script d'analyse et le dashboard.
+
+
+def label_top_points(fig, points, x, y, text, font_size=8, yshift=10):
+    # Ajoute en une seule mise à jour du layout une étiquette par ligne de points
+    # (typiquement un top N déjà calculé), sans parcourir tout le nuage de points.
+    labels = [
+        dict(
+            x=x_value,
+            y=y_value,
+            text=label,
+            showarrow=False,
+            yshift=yshift,
+            xshift=0,
+            font=dict(size=font_size, color="black")
+        )
+        for x_value, y_value, label in zip(points[x].tolist(), points[y].tolist(), points[text].astype(str).tolist())
+    ]
+    fig.update_layout(annotations=list(fig.layout.annotations) + labels)
+    return fig
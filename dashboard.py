@@ -1,8 +1,29 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import warnings
 
+from aggregates import TAB_AGGREGATES
+from exports import EXPORT_FORMATS, PayloadCache, export_name
+from filters import FilterIndex, query_key
+from metrics import MetricFrame
+from player_index import PlayerIndex
+from percentiles import GLOBAL_SUFFIX
+from players_data import COLUMN_NAMES, DATA_DIR, load_seasons
+from profiling import detailed, finish_rerun, plotly_chart, profiled, render_overlay, span, start_rerun
+from rankings import RankingIndex
+from roles import MODEL_PATH, ROLE_FEATURES, assign_role, feature_frame, fit_role_model, saved_role_model
+from schema import memory_report
+from search import SearchIndex
+from similarity import MIN_MINUTES, SimilarityIndex
+
 # Supprimer tous les warnings
 warnings.filterwarnings('ignore')
 pd.options.mode.chained_assignment = None
@@ -14,127 +35,197 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Durées de chaque étape du rerun, journalisées dans logs/reruns.jsonl (voir profiling.py)
+start_rerun()
+
 st.title("Dashboard des joueurs des 5 plus grandes ligues mondial ")
 st.markdown("---")
 
 
-@st.cache_data
+# Un seul frame partagé par toutes les sessions (cache_resource : ni pickle ni copie par
+# session), à ne jamais modifier en place. Avec le copy-on-write de pandas (toujours actif
+# depuis pandas 3, d'où pandas>=3.0 dans requirements.txt), les sélections et les assign()
+# des onglets sont des vues paresseuses : seule une écriture copie.
+@st.cache_resource
 def load_data():
-    df = pd.read_csv('top5-players24-25.csv')
-    df_cleaned = df.dropna().copy()
-
-    mp_replaced = df_cleaned['MP'].replace(0, pd.NA)
-    df_cleaned['Buts par Match'] = (df_cleaned['Gls'] / mp_replaced).fillna(0)
-    df_cleaned['Passes Déc par Match'] = (df_cleaned['Ast'] / mp_replaced).fillna(0)
-    df_cleaned['Minutes par Match'] = (df_cleaned['Min'] / mp_replaced).fillna(0)
-
-    column_names = {
-        'Player': 'Joueur',
-        'Nation': 'Nationalité',
-        'Squad': 'Équipe',
-        'Comp': 'Ligue',
-        'Age': 'Âge',
-        '90s': 'Matchs 90',
-        'Pos': 'Position',
-        'MP': 'Matchs Joués',
-        'Starts': 'Titularisations',
-        'Min': 'Minutes',
-        'Gls': 'Buts',
-        'Ast': 'Passes Décisives',
-        'G+A': 'Buts plus Passes',
-        'xG': 'xG',
-        'xAG': 'xAG',
-        'PrgC': 'Courses Progressives',
-        'PrgP': 'Passes Progressives',
-        'PrgR': 'Conduites Progressives',
-        'Gls_90': 'Performance Buts',
-        'Ast_90': 'Performance Passes',
-        'G+A_90': 'Performance Buts plus Passes',
-        'G-PK_90': 'Performance Buts sans Pénalty',
-        'G+A-PK_90': 'Performance Buts plus Passes sans Pénalty',
-        'xG_90': 'Performance xG',
-        'xAG_90': 'Performance xAG',
-        'xG+xAG_90': 'Performance xG plus xAG',
-        'npxG': 'npxG',
-        'npxG_90': 'Performance npxG',
-        'npxG+xAG': 'npxG plus xAG',
-        'npxG+xAG_90': 'Performance npxG plus xAG',
-        'Buts par Match': 'Buts par Match',
-        'Passes_Dec_par_Match': 'Passes Déc par Match'
+    # Toutes les saisons présentes dans DATA_DIR (top5-players*.csv), colonne "Saison" ajoutée
+    return load_seasons(DATA_DIR, variant='dashboard')
+
+
+@st.cache_data
+def load_data_memory():
+    return memory_report(load_data())
+
+
+# Indicateurs dérivés non stockés dans le cache (metrics.py) : calculés au premier
+# affichage sur le frame complet, puis gardés tant que les données ne changent pas
+@st.cache_resource
+def load_metrics():
+    return MetricFrame(load_data(), COLUMN_NAMES)
+
+
+@st.cache_resource
+def load_filter_index():
+    return FilterIndex(load_data())
+
+
+@st.cache_resource
+def load_player_index():
+    return PlayerIndex(load_data())
+
+
+@st.cache_resource
+def load_similarity_index():
+    # Construit sur les totaux de saison : un joueur transféré est un seul point
+    return SimilarityIndex(load_player_index().totals, key='ID Joueur')
+
+
+@st.cache_resource
+def load_player_percentiles():
+    # Centiles précalculés par saison (cache par fichier), réalignés sur les lignes de
+    # player_index.totals : la ligne i décrit la même entrée joueur-saison
+    totals = load_player_index().totals
+    table = load_seasons(DATA_DIR, variant='percentiles')
+    keys = pd.MultiIndex.from_arrays([table['ID Joueur'], table['Saison'].astype(str)])
+    positions = keys.get_indexer(pd.MultiIndex.from_arrays([totals['ID Joueur'], totals['Saison'].astype(str)]))
+    return table.iloc[positions].reset_index(drop=True)
+
+
+@st.cache_resource
+def load_rankings():
+    # Ordres de classement : par ligne (tableau complet) et par joueur-saison (tops)
+    return RankingIndex(load_data()), RankingIndex(load_player_index().totals)
+
+
+@st.cache_resource
+def load_search_index():
+    # Un document par ligne de df : joueur, club et ligue
+    df = load_data()
+    documents = df['Joueur'].astype(str) + ' ' + df['Équipe'].astype(str) + ' ' + df['Ligue'].astype(str)
+    return SearchIndex(documents.tolist())
+
+
+@st.cache_resource
+def load_roles(model_stamp):
+    # Rôles du modèle sauvegardé par le script d'analyse (aucun ajustement ici), pour
+    # les lignes de df et pour les totaux joueur-saison ; model_stamp (date du fichier)
+    # invalide le cache quand le modèle est réajusté. Modèle illisible ou d'une autre
+    # version : comme sans modèle
+    model = saved_role_model(MODEL_PATH)
+    if model is None:
+        return None, None
+    return assign_role(load_data(), model), assign_role(load_player_index().totals, model)
+
+
+def model_stamp():
+    return os.path.getmtime(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+
+
+# Clustering des rôles sur la population filtrée : ajustements exécutés hors du thread du
+# script (un rerun interrompu n'annule pas un ajustement en cours, le suivant le réutilise)
+# et mémorisés par (filtre, indicateurs, K)
+ROLE_FIT_CACHE = 16
+ROLE_MIN_PLAYERS = 20
+# Échantillon de la recherche de K par silhouette, réduit pour répondre en moins d'une seconde
+ROLE_SAMPLE_SIZE = 1000
+# Intervalle de vérification d'un ajustement en cours (secondes)
+ROLE_POLL_SECONDS = 0.5
+
+
+@st.cache_resource
+def role_fits():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='role-fit'), OrderedDict(), threading.Lock()
+
+
+def fit_population_roles(population, features, n_clusters):
+    start = time.perf_counter()
+    model = fit_role_model(population, features, n_clusters, sample_size=ROLE_SAMPLE_SIZE)
+    X = model.transform(population)
+    roles = model.role_names(model.predict(population, X))
+
+    summary = feature_frame(population, features).groupby(roles).mean()
+    summary.insert(0, 'Joueurs', pd.Series(roles).value_counts())
+    summary = summary.rename(columns=COLUMN_NAMES).rename_axis('Rôle').reset_index()
+    return {
+        'model': model,
+        'roles': roles,
+        'coords': model.project(population, X),
+        'summary': summary.sort_values('Joueurs', ascending=False, kind='stable'),
+        'seconds': time.perf_counter() - start
     }
 
-    df_cleaned = df_cleaned.rename(columns=column_names)
-
-    def translate_position(pos):
-        translations = {
-            'GK': 'GB',
-            'DF': 'DF',
-            'MF': 'MI',
-            'FW': 'AT',
-            'DF,MF': 'DF,MI',
-            'MF,DF': 'MI,DF',
-            'MF,FW': 'MI,AT',
-            'FW,MF': 'AT,MI',
-            'DF,FW': 'DF,AT',
-            'FW,DF': 'AT,DF'
-        }
-        return translations.get(pos, pos)
-
-    df_cleaned['Position'] = df_cleaned['Position'].apply(translate_position)
-
-    def translate_nation(nation):
-        if pd.isna(nation):
-            return nation
-        nation_dict = {
-            'es ESP': 'Espagne', 'fr FRA': 'France', 'de GER': 'Allemagne',
-            'it ITA': 'Italie', 'eng ENG': 'Angleterre', 'br BRA': 'Brésil',
-            'ar ARG': 'Argentine', 'pt POR': 'Portugal', 'nl NED': 'Pays-Bas',
-            'dk DEN': 'Danemark', 'be BEL': 'Belgique', "ci CIV": "Côte d'Ivoire",
-            'ma MAR': 'Maroc', 'ch SUI': 'Suisse', 'se SWE': 'Suède',
-            'hr CRO': 'Croatie', 'at AUT': 'Autriche', 'ng NGA': 'Nigeria',
-            'us USA': 'États-Unis', 'sct SCO': 'Écosse', 'wal WAL': 'Pays de Galles',
-            'sn SEN': 'Sénégal', 'cm CMR': 'Cameroun', 'gh GHA': 'Ghana',
-            'co COL': 'Colombie', 'dz ALG': 'Algérie', 'rs SRB': 'Serbie',
-            'jp JPN': 'Japon', 'kr KOR': 'Corée du Sud', 'tn TUN': 'Tunisie',
-            'uy URU': 'Uruguay', 'tr TUR': 'Turquie', 'pl POL': 'Pologne',
-            'cz CZE': 'République Tchèque', 'mx MEX': 'Mexique', 'eg EGY': 'Égypte',
-            'nir NIR': 'Irlande du Nord', 'ie IRL': 'Irlande', 'no NOR': 'Norvège',
-            'fi FIN': 'Finlande', 'ro ROU': 'Roumanie', 'gr GRE': 'Grèce',
-            'hu HUN': 'Hongrie', 'si SVN': 'Slovénie', 'sk SVK': 'Slovaquie',
-            'ua UKR': 'Ukraine', 'gn GUI': 'Guinée', 'ga GAB': 'Gabon',
-            'ml MLI': 'Mali', 'ao ANG': 'Angola', 'za RSA': 'Afrique du Sud',
-            've VEN': 'Venezuela', 'ec ECU': 'Équateur', 'py PAR': 'Paraguay',
-            'xk KVX': 'Kosovo', 'al ALB': 'Albanie', 'ba BIH': 'Bosnie-Herzégovine',
-            'mk MKD': 'Macédoine du Nord', 'me MNE': 'Monténégro', 'bg BUL': 'Bulgarie',
-            'is ISL': 'Islande', 'lu LUX': 'Luxembourg', 'cy CYP': 'Chypre',
-            'mt MLT': 'Malte', 'md MDA': 'Moldavie', 'ge GEO': 'Géorgie',
-            'am ARM': 'Arménie', 'az AZE': 'Azerbaïdjan', 'kz KAZ': 'Kazakhstan',
-            'au AUS': 'Australie', 'nz NZL': 'Nouvelle-Zélande', 'ca CAN': 'Canada',
-            'il ISR': 'Israël', 'iq IRQ': 'Irak', 'ir IRN': 'Iran',
-            'sa KSA': 'Arabie Saoudite', 'sy SYR': 'Syrie', 'lb LBN': 'Liban',
-            'jo JOR': 'Jordanie', 'ps PSE': 'Palestine', 'ae UAE': 'Émirats Arabes Unis'
-        }
-        return nation_dict.get(nation, nation)
 
-    df_cleaned['Nationalité'] = df_cleaned['Nationalité'].apply(translate_nation)
+def submit_role_fit(key, population, features, n_clusters):
+    executor, futures, lock = role_fits()
+    with lock:
+        if key in futures:
+            futures.move_to_end(key)
+        else:
+            futures[key] = executor.submit(fit_population_roles, population, features, n_clusters)
+            while len(futures) > ROLE_FIT_CACHE:
+                futures.popitem(last=False)
+        return futures[key]
 
-    numeric_columns = [
-        'Buts par Match', 'Passes Déc par Match', 'Minutes par Match',
-        'Performance Buts', 'Performance Passes', 'Performance Buts plus Passes',
-        'Performance xG', 'Performance xAG', 'Performance xG plus xAG'
-    ]
-    existing_numeric = [col for col in numeric_columns if col in df_cleaned.columns]
-    df_cleaned[existing_numeric] = df_cleaned[existing_numeric].apply(pd.to_numeric, errors='coerce').fillna(0)
 
-    return df_cleaned
+def discard_role_fit(key):
+    _, futures, lock = role_fits()
+    with lock:
+        futures.pop(key, None)
 
 
-df = load_data()
+# Contenus des téléchargements, sérialisés au clic et partagés entre les sessions
+@st.cache_resource
+def export_cache():
+    return PayloadCache()
+
+
+# Streamlit efface l'état des widgets absents d'un rerun complet : tant que leur onglet est
+# fermé, leurs valeurs sont recopiées dans session_state pour être retrouvées à la réouverture
+def keep_widget_state(keys):
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+# Agrégations mémorisées par état de filtre (LRU borné) ; le frame filtré n'est pas haché
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_tab_aggregates(tab, filter_key, _df_filtered):
+    return TAB_AGGREGATES[tab](_df_filtered)
+
+
+def tab_aggregates(tab, filter_key, df_filtered):
+    with span(f"agrégations : {tab}"):
+        return cached_tab_aggregates(tab, filter_key, df_filtered)
+
+
+with span("chargement des données"):
+    df = load_data()
+with span("chargement des index"):
+    filter_index = load_filter_index()
+    player_index = load_player_index()
+    player_percentiles = load_player_percentiles()
+    row_rankings, player_rankings = load_rankings()
+with span("chargement des rôles"):
+    role_stamp = model_stamp()
+    row_roles, player_roles = load_roles(role_stamp) if role_stamp is not None else (None, None)
 
 st.sidebar.header("Filtres")
 
 st.sidebar.info(" Aucun filtre est utilisé par défaut.")
 
+season_options = list(df['Saison'].cat.categories)
+# Libellés des entrées joueur-saison (avec la saison dès qu'il y en a plusieurs)
+player_labels = player_index.season_labels if len(season_options) > 1 else player_index.labels
+if len(season_options) > 1:
+    selected_seasons = st.sidebar.multiselect(
+        "Saisons",
+        options=season_options,
+        default=[],
+        help="Aucune sélection = toutes les saisons"
+    )
+else:
+    selected_seasons = []
+
 selected_leagues = st.sidebar.multiselect(
     "Ligues",
     options=sorted(df['Ligue'].unique()),
@@ -150,28 +241,30 @@ positions = st.sidebar.multiselect(
 )
 
 # Filtre âge optionnel avec checkbox
+age_min, age_max = (int(bound) for bound in filter_index.bounds('Âge'))
 filter_age = st.sidebar.checkbox("Filtrer par âge", value=False)
 if filter_age:
     age_range = st.sidebar.slider(
         "Âge des joueurs",
-        int(df['Âge'].min()),
-        int(df['Âge'].max()),
-        (int(df['Âge'].min()), int(df['Âge'].max()))
+        age_min,
+        age_max,
+        (age_min, age_max)
     )
 else:
-    age_range = (int(df['Âge'].min()), int(df['Âge'].max()))
+    age_range = (age_min, age_max)
 
 # Filtre matchs joués optionnel avec checkbox
+mp_min, mp_max = (int(bound) for bound in filter_index.bounds('Matchs Joués'))
 filter_matches = st.sidebar.checkbox("Filtrer par nombre de matchs", value=False)
 if filter_matches:
     mp_range = st.sidebar.slider(
         "Nombre de matchs joués",
-        int(df['Matchs Joués'].min()),
-        int(df['Matchs Joués'].max()),
-        (int(df['Matchs Joués'].min()), int(df['Matchs Joués'].max()))
+        mp_min,
+        mp_max,
+        (mp_min, mp_max)
     )
 else:
-    mp_range = (int(df['Matchs Joués'].min()), int(df['Matchs Joués'].max()))
+    mp_range = (mp_min, mp_max)
 
 # Filtre buts optionnel avec checkbox
 filter_goals = st.sidebar.checkbox("Filtrer par nombre de buts", value=False)
@@ -179,30 +272,33 @@ if filter_goals:
     min_goals = st.sidebar.slider(
         "Nombre minimum de buts",
         0,
-        int(df['Buts'].max()),
+        int(filter_index.bounds('Buts')[1]),
         0
     )
 else:
     min_goals = 0
 
-# Logique de filtrage : si aucun filtre n'est sélectionné, on affiche tout
-league_filter = df['Ligue'].isin(selected_leagues) if selected_leagues else True
-position_filter = df['Position'].isin(positions) if positions else True
-
-df_filtered = df[
-    league_filter &
-    position_filter &
-    (df['Âge'] >= age_range[0]) &
-    (df['Âge'] <= age_range[1]) &
-    (df['Matchs Joués'] >= mp_range[0]) &
-    (df['Matchs Joués'] <= mp_range[1]) &
-    (df['Buts'] >= min_goals)
-]
+# Logique de filtrage : si aucun filtre n'est sélectionné, on affiche tout.
+# Les lignes sont obtenues depuis l'index précalculé (bitmaps + ordres triés).
+with span("filtres"):
+    filter_rows = filter_index.rows(
+        leagues=selected_leagues,
+        positions=positions,
+        age_range=age_range,
+        mp_range=mp_range,
+        min_goals=min_goals,
+        seasons=selected_seasons
+    )
+    # Sans filtre, le frame partagé lui-même (aucune copie)
+    df_filtered = df if len(filter_rows) == len(df) else df.iloc[filter_rows]
+filter_key = query_key(selected_leagues, positions, age_range, mp_range, min_goals, selected_seasons)
 
 st.sidebar.markdown("---")
 
 # Compteur de filtres actifs
 active_filters = 0
+if selected_seasons:
+    active_filters += 1
 if selected_leagues:
     active_filters += 1
 if positions:
@@ -218,6 +314,9 @@ col_metric1, col_metric2 = st.sidebar.columns(2)
 col_metric1.metric("Joueurs affichés", len(df_filtered))
 col_metric2.metric("Filtres actifs", active_filters)
 
+memory = load_data_memory()
+st.sidebar.caption(f"💾 Données en mémoire : {memory['after_mb']:.1f} Mo (-{memory['saved_pct']:.0f}% grâce au schéma compact)")
+
 if active_filters > 0:
     if st.sidebar.button("🔄 Réinitialiser tous les filtres", width='stretch'):
         st.rerun()
@@ -236,624 +335,724 @@ with col3:
 st.markdown("---")
 
 
-tab_overview, tab_individual, tab_leagues, tab_details = st.tabs([
+# Les onglets suivent l'onglet actif : seules les agrégations de l'onglet visible sont calculées
+tab_overview, tab_individual, tab_leagues, tab_details, tab_roles = st.tabs([
     "Vue d'ensemble",
     "Analyses performances",
     "Comparaison des ligues",
-    "Analyse joueurs"
-])
+    "Analyse joueurs",
+    "Rôles"
+], key="active_tab", on_change="rerun")
+
+
+# Onglets : chaque onglet est un fragment, recalculé seul quand ses propres widgets changent
+@st.fragment
+@profiled("onglet vue d'ensemble")
+def overview_tab(filter_key, df_filtered):
+    overview = tab_aggregates('overview', filter_key, df_filtered)
+    position_counts = overview['position_counts']
+    league_counts = overview['league_counts']
+
+    col_distribution, col_leagues = st.columns([1.6, 1])
+
+    with col_distribution:
+        fig_positions = px.bar(
+            position_counts,
+            x='Nombre',
+            y='Position',
+            orientation='h',
+            title='Joueurs par position',
+            text='Nombre',
+            color='Nombre',
+            color_continuous_scale='Viridis'
+        )
+        fig_positions.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_positions.update_layout(height=450, showlegend=False)
+        plotly_chart('positions', fig_positions, width='stretch')
+
+    with col_leagues:
+        fig_leagues = px.pie(
+            league_counts,
+            names='Ligue',
+            values='Nombre',
+            hole=0.4,
+            title='Répartition par ligue',
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig_leagues.update_layout(height=450)
+        plotly_chart('leagues', fig_leagues, width='stretch')
+
+    st.markdown("---")
+
+    st.subheader("Nations les plus représentées")
+    top_nations = overview['top_nations']
+
+    col_nations, col_overview_metrics = st.columns([2, 1])
+
+    with col_nations:
+        fig_nations = px.bar(
+            top_nations,
+            x='Nationalité',
+            y='Nombre',
+            text='Nombre',
+            color='Nombre',
+            color_continuous_scale='Blues',
+            title='Top 10 des nations'
+        )
+        fig_nations.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_nations.update_layout(height=450, showlegend=False, xaxis_tickangle=-45)
+        plotly_chart('nations', fig_nations, width='stretch')
+
+    with col_overview_metrics:
+        st.metric("Nombre de nations", overview['nations'])
+        st.metric("Nombre d'équipes", overview['teams'])
+        st.metric("Ligues couvertes", overview['leagues'])
+        st.metric("Positions représentées", overview['positions'])
+
+    st.markdown("---")
+
+    st.subheader("Répartition par âge : jeunes talents")
+
+    col_age1, col_age2 = st.columns([1, 1.5])
+
+    with col_age1:
+        age_counts = overview['age_counts']
+
+        fig_age_pie = px.pie(
+            age_counts,
+            names='Catégorie',
+            values='Nombre',
+            title='Répartition générale par âge',
+            hole=0.4,
+            color_discrete_sequence=['#A8DADC', '#457B9D']
+        )
+        fig_age_pie.update_traces(textinfo='percent+label', textposition='inside')
+        fig_age_pie.update_layout(height=400)
+        plotly_chart('age_pie', fig_age_pie, width='stretch')
+
+    with col_age2:
+        # Nombre de joueurs par catégorie d'âge et par ligue
+        league_age_detail = overview['league_age_detail']
+
+        fig_age_league = px.bar(
+            league_age_detail,
+            x='Ligue',
+            y='Nombre',
+            color='Catégorie',
+            title='Répartition jeunes vs expérimentés par ligue',
+            text='Nombre',
+            barmode='group',
+            color_discrete_sequence=['#A8DADC', '#457B9D']
+        )
+        fig_age_league.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_age_league.update_layout(
+            height=400,
+            yaxis_title="Nombre de joueurs",
+            xaxis_title="Ligue",
+            legend_title_text="Catégorie d'âge"
+        )
+        plotly_chart('age_league', fig_age_league, width='stretch')
+
+    st.markdown("---")
+
+    st.subheader("Indicateurs globaux")
+    col_global_1, col_global_2, col_global_3 = st.columns(3)
+    col_global_1.metric("Performance Buts moyenne", f"{overview['goals_performance_mean']:.2f}")
+    col_global_2.metric("Performance Passes moyenne", f"{overview['assists_performance_mean']:.2f}")
+    col_global_3.metric("Minutes moyennes par match", f"{overview['minutes_per_match_mean']:.1f}")
+
 
 with tab_overview:
     st.header("Vue d'ensemble des statistiques")
 
     if df_filtered.empty:
         st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
-    else:
-        position_counts = df_filtered['Position'].value_counts().reset_index()
-        position_counts.columns = ['Position', 'Nombre']
-        position_counts = position_counts.sort_values('Nombre', ascending=True)
-
-        league_counts = df_filtered['Ligue'].value_counts().reset_index()
-        league_counts.columns = ['Ligue', 'Nombre']
-
-        col_distribution, col_leagues = st.columns([1.6, 1])
-
-        with col_distribution:
-            fig_positions = px.bar(
-                position_counts,
-                x='Nombre',
-                y='Position',
-                orientation='h',
-                title='Joueurs par position',
-                text='Nombre',
-                color='Nombre',
-                color_continuous_scale='Viridis'
-            )
-            fig_positions.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_positions.update_layout(height=450, showlegend=False)
-            st.plotly_chart(fig_positions, width='stretch')
-
-        with col_leagues:
-            fig_leagues = px.pie(
-                league_counts,
-                names='Ligue',
-                values='Nombre',
-                hole=0.4,
-                title='Répartition par ligue',
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_leagues.update_layout(height=450)
-            st.plotly_chart(fig_leagues, width='stretch')
+    elif tab_overview.open:
+        overview_tab(filter_key, df_filtered)
 
-        st.markdown("---")
-
-        st.subheader("Nations les plus représentées")
-        top_nations = df_filtered['Nationalité'].value_counts().head(10).reset_index()
-        top_nations.columns = ['Nationalité', 'Nombre']
-
-        col_nations, col_overview_metrics = st.columns([2, 1])
-
-        with col_nations:
-            fig_nations = px.bar(
-                top_nations,
-                x='Nationalité',
-                y='Nombre',
-                text='Nombre',
-                color='Nombre',
-                color_continuous_scale='Blues',
-                title='Top 10 des nations'
-            )
-            fig_nations.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_nations.update_layout(height=450, showlegend=False, xaxis_tickangle=-45)
-            st.plotly_chart(fig_nations, width='stretch')
 
-        with col_overview_metrics:
-            st.metric("Nombre de nations", df_filtered['Nationalité'].nunique())
-            st.metric("Nombre d'équipes", df_filtered['Équipe'].nunique())
-            st.metric("Ligues couvertes", df_filtered['Ligue'].nunique())
-            st.metric("Positions représentées", df_filtered['Position'].nunique())
+@st.fragment
+@profiled("onglet performances")
+def performance_tab(filter_key, filter_rows, df_filtered):
+    performance = tab_aggregates('performance', filter_key, df_filtered)
 
-        st.markdown("---")
-        
-        st.subheader("Répartition par âge : jeunes talents")
-        
-        # Créer catégories d'âge
-        df_age_split = df_filtered.copy()
-        df_age_split['Catégorie'] = df_age_split['Âge'].apply(lambda x: 'Moins de 21 ans' if x < 21 else '21 ans et plus')
-        
-        col_age1, col_age2 = st.columns([1, 1.5])
-        
-        with col_age1:
-            age_counts = df_age_split['Catégorie'].value_counts().reset_index()
-            age_counts.columns = ['Catégorie', 'Nombre']
-            age_counts['Pourcentage'] = (age_counts['Nombre'] / age_counts['Nombre'].sum() * 100).round(1)
-            
-            fig_age_pie = px.pie(
-                age_counts,
-                names='Catégorie',
-                values='Nombre',
-                title='Répartition générale par âge',
-                hole=0.4,
-                color_discrete_sequence=['#A8DADC', '#457B9D']
-            )
-            fig_age_pie.update_traces(textinfo='percent+label', textposition='inside')
-            fig_age_pie.update_layout(height=400)
-            st.plotly_chart(fig_age_pie, width='stretch')
-        
-        with col_age2:
-            # Nombre de joueurs par catégorie d'âge et par ligue
-            league_age_detail = df_age_split.groupby(['Ligue', 'Catégorie']).size().reset_index(name='Nombre')
-            
-            fig_age_league = px.bar(
-                league_age_detail,
-                x='Ligue',
-                y='Nombre',
-                color='Catégorie',
-                title='Répartition jeunes vs expérimentés par ligue',
-                text='Nombre',
-                barmode='group',
-                color_discrete_sequence=['#A8DADC', '#457B9D']
-            )
-            fig_age_league.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_age_league.update_layout(
-                height=400,
-                yaxis_title="Nombre de joueurs",
-                xaxis_title="Ligue",
-                legend_title_text="Catégorie d'âge"
-            )
-            st.plotly_chart(fig_age_league, width='stretch')
+    st.subheader("Moyennes offensives par position")
+    position_performance = performance['position_performance']
 
-        st.markdown("---")
+    col_perf_1, col_perf_2 = st.columns(2)
 
-        st.subheader("Indicateurs globaux")
-        col_global_1, col_global_2, col_global_3 = st.columns(3)
-        col_global_1.metric("Performance Buts moyenne", f"{df_filtered['Performance Buts'].mean():.2f}")
-        col_global_2.metric("Performance Passes moyenne", f"{df_filtered['Performance Passes'].mean():.2f}")
-        col_global_3.metric("Minutes moyennes par match", f"{df_filtered['Minutes par Match'].mean():.1f}")
+    with col_perf_1:
+        fig_goals90 = px.bar(
+            position_performance.sort_values('Performance Buts', ascending=False),
+            x='Position',
+            y='Performance Buts',
+            color='Performance Buts',
+            color_continuous_scale='Reds',
+            title='Performance Buts moyenne par position',
+            text='Performance Buts'
+        )
+        fig_goals90.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        fig_goals90.update_layout(height=420, showlegend=False)
+        plotly_chart('goals90', fig_goals90, width='stretch')
+
+    with col_perf_2:
+        fig_assists90 = px.bar(
+            position_performance.sort_values('Performance Passes', ascending=False),
+            x='Position',
+            y='Performance Passes',
+            color='Performance Passes',
+            color_continuous_scale='Blues',
+            title='Performance Passes moyenne par position',
+            text='Performance Passes'
+        )
+        fig_assists90.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        fig_assists90.update_layout(height=420, showlegend=False)
+        plotly_chart('assists90', fig_assists90, width='stretch')
 
-with tab_individual:
-    st.header("Analyses performances")
+    st.markdown("---")
 
-    if df_filtered.empty:
-        st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
-    else:
-        st.subheader("Moyennes offensives par position")
-        position_performance = df_filtered.groupby('Position').agg({
-            'Performance Buts': 'mean',
-            'Performance Passes': 'mean'
-        }).reset_index()
-
-        col_perf_1, col_perf_2 = st.columns(2)
-
-        with col_perf_1:
-            fig_goals90 = px.bar(
-                position_performance.sort_values('Performance Buts', ascending=False),
-                x='Position',
-                y='Performance Buts',
-                color='Performance Buts',
-                color_continuous_scale='Reds',
-                title='Performance Buts moyenne par position',
-                text='Performance Buts'
-            )
-            fig_goals90.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig_goals90.update_layout(height=420, showlegend=False)
-            st.plotly_chart(fig_goals90, width='stretch')
-
-        with col_perf_2:
-            fig_assists90 = px.bar(
-                position_performance.sort_values('Performance Passes', ascending=False),
-                x='Position',
-                y='Performance Passes',
-                color='Performance Passes',
-                color_continuous_scale='Blues',
-                title='Performance Passes moyenne par position',
-                text='Performance Passes'
-            )
-            fig_assists90.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig_assists90.update_layout(height=420, showlegend=False)
-            st.plotly_chart(fig_assists90, width='stretch')
+    st.subheader("Temps de jeu et rendement offensif")
+    fig_minutes_goals = px.scatter(
+        df_filtered,
+        x='Minutes',
+        y='Performance Buts',
+        color='Position',
+        size='Performance Passes',
+        hover_data=['Joueur', 'Équipe', 'Matchs Joués', 'Buts', 'Passes Décisives', 'Performance Passes'],
+        title='Minutes jouées vs Performance Buts',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig_minutes_goals.update_layout(height=450)
+    plotly_chart('minutes_goals', fig_minutes_goals, width='stretch')
 
-        st.markdown("---")
+    col_scatter_1, col_scatter_2 = st.columns(2)
 
-        st.subheader("Temps de jeu et rendement offensif")
-        fig_minutes_goals = px.scatter(
+    with col_scatter_1:
+        fig_goals_assists = px.scatter(
             df_filtered,
-            x='Minutes',
-            y='Performance Buts',
+            x='Performance Buts',
+            y='Performance Passes',
+            size='Minutes par Match',
             color='Position',
+            hover_data=['Joueur', 'Équipe', 'Matchs Joués'],
+            title='Performance Buts vs Performance Passes',
+            color_discrete_sequence=px.colors.qualitative.Plotly
+        )
+        fig_goals_assists.update_layout(height=420)
+        plotly_chart('goals_assists', fig_goals_assists, width='stretch')
+
+    with col_scatter_2:
+        # Vue sur les seules colonnes du graphique, plus le niveau d'expérience des lignes filtrées
+        experience_view = df_filtered[
+            ['Joueur', 'Équipe', 'Position', 'Matchs Joués', 'Performance Buts', 'Performance Passes', 'Minutes par Match']
+        ].assign(**{'Niveau Expérience': load_metrics()['Niveau Expérience'].iloc[filter_rows].array})
+        fig_experience = px.scatter(
+            experience_view,
+            x='Matchs Joués',
+            y='Performance Buts',
+            color='Niveau Expérience',
             size='Performance Passes',
-            hover_data=['Joueur', 'Équipe', 'Matchs Joués', 'Buts', 'Passes Décisives', 'Performance Passes'],
-            title='Minutes jouées vs Performance Buts',
-            color_discrete_sequence=px.colors.qualitative.Set2
+            hover_data=['Joueur', 'Équipe', 'Position', 'Minutes par Match'],
+            title="Rendement offensif selon l'expérience",
+            color_discrete_sequence=px.colors.qualitative.Safe
         )
-        fig_minutes_goals.update_layout(height=450)
-        st.plotly_chart(fig_minutes_goals, width='stretch')
-
-        col_scatter_1, col_scatter_2 = st.columns(2)
-
-        with col_scatter_1:
-            fig_goals_assists = px.scatter(
-                df_filtered,
-                x='Performance Buts',
-                y='Performance Passes',
-                size='Minutes par Match',
-                color='Position',
-                hover_data=['Joueur', 'Équipe', 'Matchs Joués'],
-                title='Performance Buts vs Performance Passes',
-                color_discrete_sequence=px.colors.qualitative.Plotly
-            )
-            fig_goals_assists.update_layout(height=420)
-            st.plotly_chart(fig_goals_assists, width='stretch')
-
-        with col_scatter_2:
-            upper_limit = max(int(df_filtered['Matchs Joués'].max()), 31)
-            experience_view = df_filtered.copy()
-            experience_view['Niveau Expérience'] = pd.cut(
-                experience_view['Matchs Joués'],
-                bins=[0, 10, 20, 30, upper_limit + 1],
-                labels=['Débutant (1-10)', 'Intermédiaire (11-20)', 'Confirmé (21-30)', 'Expert (31+)'],
-                right=False,
-                include_lowest=True
-            )
-            fig_experience = px.scatter(
-                experience_view,
-                x='Matchs Joués',
-                y='Performance Buts',
-                color='Niveau Expérience',
-                size='Performance Passes',
-                hover_data=['Joueur', 'Équipe', 'Position', 'Minutes par Match'],
-                title="Rendement offensif selon l'expérience",
-                color_discrete_sequence=px.colors.qualitative.Safe
-            )
-            fig_experience.update_layout(height=420)
-            st.plotly_chart(fig_experience, width='stretch')
+        fig_experience.update_layout(height=420)
+        plotly_chart('experience', fig_experience, width='stretch')
 
-        st.markdown("---")
+    st.markdown("---")
 
-        st.subheader("Matrice de corrélation")
-        
-        correlation_columns = ['Performance Buts', 'Performance Passes', 'Minutes par Match', 'Matchs Joués', 'Âge']
-        correlation_data = df_filtered[correlation_columns].corr() if not df_filtered.empty else pd.DataFrame(columns=correlation_columns)
-        
-        if not correlation_data.empty:
-            fig_corr = px.imshow(
-                correlation_data,
-                text_auto='.2f',
-                aspect='auto',
-                color_continuous_scale='RdBu_r',
-                title='Corrélations des indicateurs clés'
-            )
-            fig_corr.update_layout(height=500)
-            st.plotly_chart(fig_corr, width='stretch')
-        else:
-            st.write("La matrice de corrélation est disponible lorsque des joueurs sont filtrés.")
+    st.subheader("Matrice de corrélation")
 
-        st.markdown("---")
+    correlation_data = performance['correlation']
 
-        st.subheader("Analyse multi-dimensionnelle")
-        
-        if not df_filtered.empty:
-            fig_scatter_3d = px.scatter_3d(
-                df_filtered,
-                x='Performance Buts',
-                y='Performance Passes',
-                z='Minutes par Match',
-                color='Position',
-                size='Matchs Joués',
-                hover_data=['Joueur', 'Équipe', 'Âge'],
-                title='Performance Buts, Passes et Minutes par match'
-            )
-            fig_scatter_3d.update_layout(height=600)
-            st.plotly_chart(fig_scatter_3d, width='stretch')
-        else:
-            st.write("L'analyse multi-dimensionnelle nécessite au moins un joueur filtré.")
+    if not correlation_data.empty:
+        fig_corr = px.imshow(
+            correlation_data,
+            text_auto='.2f',
+            aspect='auto',
+            color_continuous_scale='RdBu_r',
+            title='Corrélations des indicateurs clés'
+        )
+        fig_corr.update_layout(height=500)
+        plotly_chart('corr', fig_corr, width='stretch')
+    else:
+        st.write("La matrice de corrélation est disponible lorsque des joueurs sont filtrés.")
 
-        st.markdown("---")
+    st.markdown("---")
+
+    st.subheader("Analyse multi-dimensionnelle")
 
-        st.subheader("Évolution de la performance avec l'âge")
-        
-        # Performance moyenne par âge
-        age_performance = df_filtered.groupby('Âge', observed=False).agg({
-            'Performance Buts': 'mean',
-            'Performance Passes': 'mean',
-            'Joueur': 'count'
-        }).reset_index()
-        age_performance.columns = ['Âge', 'Performance Buts Moyenne', 'Performance Passes Moyenne', 'Nombre Joueurs']
-        
-        # Filtrer les âges avec au moins 10 joueurs pour éviter les outliers
-        age_performance = age_performance[age_performance['Nombre Joueurs'] >= 10]
-        
-        fig_age = px.line(
-            age_performance,
-            x='Âge',
-            y=['Performance Buts Moyenne', 'Performance Passes Moyenne'],
-            title='Évolution de la performance avec l\'âge',
-            labels={'value': 'Performance moyenne', 'variable': 'Métrique', 'Âge': 'Âge'},
-            markers=True
+    if not df_filtered.empty:
+        fig_scatter_3d = px.scatter_3d(
+            df_filtered,
+            x='Performance Buts',
+            y='Performance Passes',
+            z='Minutes par Match',
+            color='Position',
+            size='Matchs Joués',
+            hover_data=['Joueur', 'Équipe', 'Âge'],
+            title='Performance Buts, Passes et Minutes par match'
         )
-        fig_age.update_layout(height=450, legend_title_text='Métrique')
-        st.plotly_chart(fig_age, width='stretch')
+        fig_scatter_3d.update_layout(height=600)
+        plotly_chart('scatter_3d', fig_scatter_3d, width='stretch')
+    else:
+        st.write("L'analyse multi-dimensionnelle nécessite au moins un joueur filtré.")
+
+    st.markdown("---")
+
+    st.subheader("Évolution de la performance avec l'âge")
+
+    # Performance moyenne par âge (âges avec au moins 10 joueurs)
+    age_performance = performance['age_performance']
+
+    fig_age = px.line(
+        age_performance,
+        x='Âge',
+        y=['Performance Buts Moyenne', 'Performance Passes Moyenne'],
+        title='Évolution de la performance avec l\'âge',
+        labels={'value': 'Performance moyenne', 'variable': 'Métrique', 'Âge': 'Âge'},
+        markers=True
+    )
+    fig_age.update_layout(height=450, legend_title_text='Métrique')
+    plotly_chart('age', fig_age, width='stretch')
+
+
+with tab_individual:
+    st.header("Analyses performances")
+
+    if df_filtered.empty:
+        st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+    elif tab_individual.open:
+        performance_tab(filter_key, filter_rows, df_filtered)
+
+
+@st.fragment
+@profiled("onglet ligues")
+def leagues_tab(filter_key, df_filtered):
+    league_stats = tab_aggregates('leagues', filter_key, df_filtered)
+
+    st.subheader("Volumes cumulés")
+    league_totals = league_stats['league_totals']
+    st.dataframe(league_totals, hide_index=True, width='stretch')
+
+    league_totals_long = league_totals.melt(id_vars='Ligue', var_name='Statistique', value_name='Valeur')
+
+    fig_league_totals = px.bar(
+        league_totals_long,
+        x='Ligue',
+        y='Valeur',
+        color='Statistique',
+        barmode='group',
+        title='Buts et passes décisives cumulés par ligue',
+        color_discrete_map={
+            'Buts': '#EF553B',
+            'Passes Décisives': '#636EFA'
+        }
+    )
+    fig_league_totals.update_layout(height=480, xaxis_title='Ligue', yaxis_title='Volume cumulé')
+    plotly_chart('league_totals', fig_league_totals, width='stretch')
+
+    st.markdown("---")
+
+    st.subheader("Moyennes par joueur")
+    league_means = league_stats['league_means']
+    st.dataframe(league_means.round(3), hide_index=True, width='stretch')
+
+    league_means_long = league_means.melt(id_vars='Ligue', var_name='Indicateur', value_name='Valeur')
+
+    fig_league_means = px.bar(
+        league_means_long,
+        x='Ligue',
+        y='Valeur',
+        color='Indicateur',
+        barmode='group',
+        title='Performance moyenne par joueur et par ligue',
+        color_discrete_map={
+            'Performance Buts': '#EF553B',
+            'Performance Passes': '#636EFA'
+        }
+    )
+    fig_league_means.update_layout(height=480, xaxis_title='Ligue', yaxis_title='Valeur moyenne')
+    plotly_chart('league_means', fig_league_means, width='stretch')
+
+    st.markdown("---")
+
+    st.subheader("Répartition des positions")
+    positions_league = league_stats['positions_league']
+    fig_positions_league = px.bar(
+        positions_league,
+        x='Ligue',
+        y='Nombre',
+        color='Position',
+        barmode='stack',
+        title='Composition des effectifs par position et par ligue'
+    )
+    fig_positions_league.update_layout(height=500, xaxis_title='Ligue', yaxis_title='Nombre de joueurs')
+    plotly_chart('positions_league', fig_positions_league, width='stretch')
+
 
 with tab_leagues:
     st.header("Comparaison des ligues")
 
     if df_filtered.empty:
         st.write("Aucune donnée à comparer pour les filtres actuels.")
-    else:
-        st.subheader("Volumes cumulés")
-        league_totals = df_filtered.groupby('Ligue')[['Buts', 'Passes Décisives']].sum().reset_index()
-        league_totals = league_totals.sort_values('Buts', ascending=False)
-        st.dataframe(league_totals, hide_index=True, width='stretch')
+    elif tab_leagues.open:
+        leagues_tab(filter_key, df_filtered)
 
-        league_totals_long = league_totals.melt(id_vars='Ligue', var_name='Statistique', value_name='Valeur')
 
-        fig_league_totals = px.bar(
-            league_totals_long,
-            x='Ligue',
-            y='Valeur',
-            color='Statistique',
-            barmode='group',
-            title='Buts et passes décisives cumulés par ligue',
-            color_discrete_map={
-                'Buts': '#EF553B',
-                'Passes Décisives': '#636EFA'
-            }
-        )
-        fig_league_totals.update_layout(height=480, xaxis_title='Ligue', yaxis_title='Volume cumulé')
-        st.plotly_chart(fig_league_totals, width='stretch')
+# Widgets des sections de l'onglet "Analyse joueurs", conservés quand l'onglet est fermé
+DETAILS_WIDGETS = [
+    'percentile_scope', 'player_search', 'player_choice', 'similar_count', 'similar_leagues',
+    'similar_positions', 'similar_age', 'player_compare', 'ranking_metric', 'ranking_size',
+    'ranking_minutes', 'table_search', 'export_format'
+]
 
-        st.markdown("---")
 
-        st.subheader("Moyennes par joueur")
-        league_means = df_filtered.groupby('Ligue')[['Performance Buts', 'Performance Passes']].mean().reset_index()
-        league_means = league_means.sort_values('Performance Buts', ascending=False)
-        st.dataframe(league_means.round(3), hide_index=True, width='stretch')
+# Sections de l'onglet "Analyse joueurs" : fragments indépendants, un widget ne relance
+# que sa propre section. Leurs entrées (lignes de totaux et options triées) sont
+# calculées une fois par état de filtre.
+@st.cache_data(max_entries=32, show_spinner=False)
+def player_choices(filter_key, _filter_rows):
+    # Une entrée par joueur et par saison (clubs cumulés pour les joueurs transférés)
+    total_rows = player_index.totals_rows(_filter_rows)
+    player_options = total_rows[np.argsort(player_labels[total_rows], kind='stable')].tolist()
+    return total_rows, player_options
 
-        league_means_long = league_means.melt(id_vars='Ligue', var_name='Indicateur', value_name='Valeur')
 
-        fig_league_means = px.bar(
-            league_means_long,
-            x='Ligue',
-            y='Valeur',
-            color='Indicateur',
-            barmode='group',
-            title='Performance moyenne par joueur et par ligue',
-            color_discrete_map={
-                'Performance Buts': '#EF553B',
-                'Performance Passes': '#636EFA'
-            }
+@st.fragment
+@profiled("fiche joueur")
+def player_card_section(filter_rows, total_rows, player_options, percentile_suffix):
+    player_totals = player_index.totals
+
+    player_search = st.text_input(
+        "Rechercher un joueur (nom ou club)",
+        placeholder="Exemple : Mbappe, Odegaard, Madrid",
+        key="player_search",
+        help="Accents, majuscules et fautes de frappe légères sont tolérés ; résultats triés par pertinence"
+    )
+    choice_options = player_options
+    if player_search:
+        # Seules les lignes filtrées sont retenues, dans l'ordre de pertinence
+        search_rows, _ = load_search_index().search(player_search, rows=filter_rows)
+        ranked_totals = pd.unique(player_index.total_of_row[search_rows]).tolist()
+        if ranked_totals:
+            choice_options = ranked_totals
+        else:
+            st.warning(f"Aucun joueur ne correspond à « {player_search} » avec les filtres actuels.")
+
+    selected_total = st.selectbox(
+        "Sélectionner un joueur à analyser",
+        options=choice_options,
+        format_func=lambda row: player_labels[row],
+        key="player_choice"
+    )
+
+    selected_player = player_totals.iloc[selected_total]
+
+    info_cols = st.columns(4)
+    info_cols[0].write(f"**Joueur :** {selected_player['Joueur']}")
+    info_cols[1].write(f"**Âge :** {selected_player['Âge']}")
+    info_cols[2].write(f"**Équipe :** {selected_player['Équipe']}")
+    info_cols[3].write(f"**Ligue :** {selected_player['Ligue']}")
+    if player_roles is not None:
+        st.caption(f"Rôle estimé (modèle de rôles du script d'analyse) : {player_roles[selected_total]}")
+
+    stat_cols = st.columns(3)
+    stat_cols[0].metric("Matchs joués", int(selected_player['Matchs Joués']))
+    stat_cols[1].metric("Buts", int(selected_player['Buts']))
+    stat_cols[2].metric("Passes décisives", int(selected_player['Passes Décisives']))
+
+    ratio_cols = st.columns(3)
+    ratio_cols[0].metric("Buts par match", f"{selected_player['Buts par Match']:.3f}")
+    ratio_cols[1].metric("Passes décisives par match", f"{selected_player['Passes Déc par Match']:.3f}")
+    ratio_cols[2].metric("Minutes par match", f"{selected_player['Minutes par Match']:.1f}")
+
+    if selected_player['Passages'] > 1:
+        stint_rows = player_index.player_rows(selected_player['ID Joueur'])
+        stint_rows = stint_rows[player_index.total_of_row[stint_rows] == selected_total]
+        st.caption("Joueur transféré en cours de saison : statistiques cumulées sur ses clubs")
+        st.dataframe(
+            df.iloc[stint_rows][['Équipe', 'Ligue', 'Position', 'Matchs Joués', 'Minutes', 'Buts', 'Passes Décisives']],
+            hide_index=True,
+            width='stretch'
         )
-        fig_league_means.update_layout(height=480, xaxis_title='Ligue', yaxis_title='Valeur moyenne')
-        st.plotly_chart(fig_league_means, width='stretch')
 
-        st.markdown("---")
+    radar_metrics = [
+        ('Performance Buts', 'Buts'),
+        ('Performance Passes', 'Passes'),
+        ('Performance Buts plus Passes', 'Buts+Passes'),
+        ('Performance xG', 'xG'),
+        ('Performance xAG', 'xAG')
+    ]
+    selected_percentiles = player_percentiles.iloc[selected_total]
+
+    radar_data = []
+    for metric, label in radar_metrics:
+        if metric in selected_player.index:
+            radar_data.append({
+                'Indicateur': label,
+                'Centile': float(selected_percentiles[metric + percentile_suffix]),
+                'Valeur': float(selected_player[metric])
+            })
+
+    radar_df = pd.DataFrame(radar_data)
+    if not radar_df.empty:
+        fig_radar = px.line_polar(
+            radar_df,
+            r='Centile',
+            theta='Indicateur',
+            line_close=True,
+            range_r=[0, 100],
+            hover_data={'Valeur': ':.2f'}
+        )
+        fig_radar.update_traces(fill='toself')
+        fig_radar.update_layout(height=420, margin=dict(l=40, r=40, t=60, b=40))
+        plotly_chart('radar', fig_radar, width='stretch')
+    else:
+        st.write("Données insuffisantes pour générer un radar pour ce joueur.")
 
-        st.subheader("Répartition des positions")
-        positions_league = df_filtered.groupby(['Ligue', 'Position']).size().reset_index(name='Nombre')
-        fig_positions_league = px.bar(
-            positions_league,
-            x='Ligue',
-            y='Nombre',
-            color='Position',
-            barmode='stack',
-            title='Composition des effectifs par position et par ligue'
+    st.markdown("---")
+
+    # Joueurs similaires : plus proches voisins dans l'index par 90 minutes
+    st.subheader(f"Joueurs similaires à {selected_player['Joueur']}")
+    st.caption(f"Distance sur les statistiques par 90 minutes standardisées, parmi les joueurs ayant joué au moins {MIN_MINUTES} minutes (toutes saisons)")
+
+    similar_cols = st.columns(4)
+    similar_count = similar_cols[0].slider("Nombre de joueurs", 5, 20, 10, key="similar_count")
+    similar_leagues = similar_cols[1].multiselect(
+        "Ligues",
+        options=sorted(df['Ligue'].unique()),
+        key="similar_leagues",
+        help="Aucune sélection = toutes les ligues"
+    )
+    similar_positions = similar_cols[2].multiselect(
+        "Positions",
+        options=sorted(df['Position'].unique()),
+        key="similar_positions",
+        help="Aucune sélection = toutes les positions"
+    )
+    similar_age = similar_cols[3].slider("Âge", age_min, age_max, (age_min, age_max), key="similar_age")
+
+    candidates = None
+    if similar_leagues or similar_positions or similar_age != (age_min, age_max):
+        candidates = player_index.totals_rows(
+            filter_index.rows(leagues=similar_leagues, positions=similar_positions, age_range=similar_age)
         )
-        fig_positions_league.update_layout(height=500, xaxis_title='Ligue', yaxis_title='Nombre de joueurs')
-        st.plotly_chart(fig_positions_league, width='stretch')
 
-with tab_details:
-    st.header("Analyse joueurs")
-    
-    if df_filtered.empty:
-        st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+    similar_rows, similar_distances = load_similarity_index().similar(selected_total, similar_count, candidates)
+    if len(similar_rows):
+        similar_columns = ['Joueur', 'Âge', 'Équipe', 'Ligue', 'Position', 'Minutes', 'Performance Buts', 'Performance Passes', 'Performance xG', 'Performance xAG']
+        if len(season_options) > 1:
+            similar_columns.insert(1, 'Saison')
+        similar_df = player_totals.iloc[similar_rows][similar_columns].round(3)
+        similar_df.insert(0, 'Distance', similar_distances.round(2))
+        st.dataframe(similar_df, hide_index=True, width='stretch')
     else:
-        # SECTION 1 : Recherche et fiche individuelle
-        st.subheader("Recherche et fiche joueur")
-        
-        player_names = sorted(df_filtered['Joueur'].unique())
-        
-        if not player_names:
-            st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+        st.write("Aucun joueur similaire ne correspond à ces critères.")
+
+
+@st.fragment
+@profiled("comparateur")
+def comparator_section(player_options, percentile_suffix):
+    player_totals = player_index.totals
+
+    compare_players = st.multiselect(
+        "Sélectionner des joueurs à comparer (maximum 4)",
+        options=player_options,
+        format_func=lambda row: player_labels[row],
+        key="player_compare"
+    )
+
+    if compare_players:
+        if len(compare_players) > 4:
+            st.warning("Seuls les quatre premiers joueurs sélectionnés seront affichés.")
+            compare_players = compare_players[:4]
+
+        # Libellé complet (club, saison) pour distinguer homonymes et saisons
+        compare_df = player_totals.iloc[compare_players].assign(Joueur=player_labels[compare_players])
+
+        if compare_df.empty:
+            st.write("Aucun joueur ne correspond à cette sélection pour les filtres actuels.")
         else:
-            player_choice = st.selectbox(
-                "Sélectionner un joueur à analyser",
-                options=player_names,
-                key="player_choice",
-                help="Utilisez la barre de recherche pour filtrer les joueurs par nom"
-            )
-            
-            selected_player = df_filtered[df_filtered['Joueur'] == player_choice].iloc[0]
-
-            info_cols = st.columns(4)
-            info_cols[0].write(f"**Joueur :** {selected_player['Joueur']}")
-            info_cols[1].write(f"**Âge :** {selected_player['Âge']}")
-            info_cols[2].write(f"**Équipe :** {selected_player['Équipe']}")
-            info_cols[3].write(f"**Ligue :** {selected_player['Ligue']}")
-
-            stat_cols = st.columns(3)
-            stat_cols[0].metric("Matchs joués", int(selected_player['Matchs Joués']))
-            stat_cols[1].metric("Buts", int(selected_player['Buts']))
-            stat_cols[2].metric("Passes décisives", int(selected_player['Passes Décisives']))
-
-            ratio_cols = st.columns(3)
-            ratio_cols[0].metric("Buts par match", f"{selected_player['Buts par Match']:.3f}")
-            ratio_cols[1].metric("Passes décisives par match", f"{selected_player['Passes Déc par Match']:.3f}")
-            ratio_cols[2].metric("Minutes par match", f"{selected_player['Minutes par Match']:.1f}")
-
-            radar_metrics = [
-                ('Performance Buts', 'Buts'),
-                ('Performance Passes', 'Passes'),
-                ('Performance Buts plus Passes', 'Buts+Passes'),
-                ('Performance xG', 'xG'),
-                ('Performance xAG', 'xAG')
+            compare_columns = [
+                'Joueur', 'Position', 'Équipe', 'Ligue', 'Matchs Joués', 'Minutes',
+                'Buts', 'Passes Décisives', 'Performance Buts', 'Performance Passes',
+                'Performance Buts plus Passes', 'Performance xG', 'Performance xAG'
             ]
-            radar_data = []
-            for metric, label in radar_metrics:
-                if metric in selected_player.index:
-                    value = pd.to_numeric(pd.Series([selected_player[metric]]), errors='coerce').fillna(0).iloc[0]
-                    radar_data.append({'Indicateur': label, 'Valeur': float(value)})
-
-            radar_df = pd.DataFrame(radar_data)
-            if not radar_df.empty and radar_df['Valeur'].max() > 0:
-                fig_radar = px.line_polar(
-                    radar_df,
-                    r='Valeur',
+            available_compare_columns = [col for col in compare_columns if col in compare_df.columns]
+            compare_table = compare_df[available_compare_columns].copy()
+
+            numeric_compare_cols = [
+                col for col in available_compare_columns
+                if pd.api.types.is_numeric_dtype(compare_table[col])
+            ]
+            compare_table[numeric_compare_cols] = compare_table[numeric_compare_cols].apply(lambda s: s.round(3))
+
+            st.dataframe(compare_table, hide_index=True, width='stretch')
+
+            radar_metrics_map = {
+                'Performance Buts': 'Buts',
+                'Performance Passes': 'Passes',
+                'Performance Buts plus Passes': 'Buts+Passes',
+                'Performance xG': 'xG',
+                'Performance xAG': 'xAG'
+            }
+            available_radar_metrics = [
+                metric for metric in radar_metrics_map.keys() if metric in compare_df.columns
+            ]
+
+            radar_source = player_percentiles.iloc[compare_players][
+                [metric + percentile_suffix for metric in available_radar_metrics]
+            ]
+            radar_source.columns = available_radar_metrics
+            radar_source.insert(0, 'Joueur', compare_df['Joueur'].to_numpy())
+            radar_long = radar_source.melt(id_vars='Joueur', var_name='Indicateur', value_name='Centile')
+            radar_long['Indicateur'] = radar_long['Indicateur'].replace(radar_metrics_map)
+
+            if not radar_long.empty:
+                fig_compare_radar = px.line_polar(
+                    radar_long,
+                    r='Centile',
                     theta='Indicateur',
+                    color='Joueur',
                     line_close=True,
-                    range_r=[0, radar_df['Valeur'].max() * 1.1]
+                    range_r=[0, 100]
                 )
-                fig_radar.update_traces(fill='toself')
-                fig_radar.update_layout(height=420, margin=dict(l=40, r=40, t=60, b=40))
-                st.plotly_chart(fig_radar, width='stretch')
+                fig_compare_radar.update_traces(fill='toself')
+                fig_compare_radar.update_layout(height=500, margin=dict(t=60, l=40, r=40, b=40))
+                plotly_chart('compare_radar', fig_compare_radar, width='stretch')
             else:
-                st.write("Données insuffisantes pour générer un radar pour ce joueur.")
-        
-            
-            st.markdown("---")
-            
-            # SECTION 2 : Comparateur de joueurs
-            st.subheader("Comparateur de joueurs")
-            
-            compare_players = st.multiselect(
-                "Sélectionner des joueurs à comparer (maximum 4)",
-                options=player_names,
-                key="player_compare"
-            )
+                st.write("Les indicateurs sélectionnés ne permettent pas de générer un radar comparatif.")
+    else:
+        st.write("Sélectionnez un ou plusieurs joueurs pour lancer la comparaison.")
 
-            if compare_players:
-                if len(compare_players) > 4:
-                    st.warning("Seuls les quatre premiers joueurs sélectionnés seront affichés.")
-                    compare_players = compare_players[:4]
-
-                compare_df = df_filtered[df_filtered['Joueur'].isin(compare_players)].copy()
-
-                if compare_df.empty:
-                    st.write("Aucun joueur ne correspond à cette sélection pour les filtres actuels.")
-                else:
-                    compare_columns = [
-                        'Joueur', 'Position', 'Équipe', 'Ligue', 'Matchs Joués', 'Minutes',
-                        'Buts', 'Passes Décisives', 'Performance Buts', 'Performance Passes',
-                        'Performance Buts plus Passes', 'Performance xG', 'Performance xAG'
-                    ]
-                    available_compare_columns = [col for col in compare_columns if col in compare_df.columns]
-                    compare_table = compare_df[available_compare_columns].copy()
-
-                    numeric_compare_cols = [
-                        col for col in available_compare_columns
-                        if pd.api.types.is_numeric_dtype(compare_table[col])
-                    ]
-                    compare_table[numeric_compare_cols] = compare_table[numeric_compare_cols].apply(lambda s: s.round(3))
-
-                    st.dataframe(compare_table, hide_index=True, width='stretch')
-
-                    radar_metrics_map = {
-                        'Performance Buts': 'Buts',
-                        'Performance Passes': 'Passes',
-                        'Performance Buts plus Passes': 'Buts+Passes',
-                        'Performance xG': 'xG',
-                        'Performance xAG': 'xAG'
-                    }
-                    available_radar_metrics = [
-                        metric for metric in radar_metrics_map.keys() if metric in compare_df.columns
-                    ]
-
-                    radar_source = compare_df[['Joueur'] + available_radar_metrics].copy()
-                    radar_long = radar_source.melt(id_vars='Joueur', var_name='Indicateur', value_name='Valeur')
-                    radar_long['Indicateur'] = radar_long['Indicateur'].replace(radar_metrics_map)
-
-                    if not radar_long.empty and radar_long['Valeur'].abs().sum() > 0:
-                        fig_compare_radar = px.line_polar(
-                            radar_long,
-                            r='Valeur',
-                            theta='Indicateur',
-                            color='Joueur',
-                            line_close=True
-                        )
-                        fig_compare_radar.update_traces(fill='toself')
-                        fig_compare_radar.update_layout(height=500, margin=dict(t=60, l=40, r=40, b=40))
-                        st.plotly_chart(fig_compare_radar, width='stretch')
-                    else:
-                        st.write("Les indicateurs sélectionnés ne permettent pas de générer un radar comparatif.")
-            else:
-                st.write("Sélectionnez un ou plusieurs joueurs pour lancer la comparaison.")
-        
-        st.markdown("---")
-        
-        # SECTION 3 : Classements et tops
-        st.subheader("Classements et tops")
-        
-        col_top1, col_top2 = st.columns(2)
-        
-        with col_top1:
-            top_scorers = df_filtered.nlargest(15, 'Buts')[
-                ['Joueur', 'Équipe', 'Position', 'Buts', 'Performance Buts']
-            ].copy()
-            top_scorers['Label'] = top_scorers['Joueur'] + ' (' + top_scorers['Équipe'] + ')'
-            
-            fig_top_scorers = px.bar(
-                top_scorers,
-                y='Label',
-                x='Buts',
-                orientation='h',
-                title='Top 15 buteurs',
-                text='Buts',
-                color='Position',
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hover_data=['Joueur', 'Équipe', 'Position', 'Buts', 'Performance Buts']
-            )
-            fig_top_scorers.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_top_scorers.update_layout(
-                yaxis=dict(autorange='reversed'),
-                height=500,
-                yaxis_title="",
-                xaxis_title="Nombre de buts"
-            )
-            st.plotly_chart(fig_top_scorers, width='stretch')
-        
-        with col_top2:
-            top_assisters = df_filtered.nlargest(15, 'Passes Décisives')[
-                ['Joueur', 'Équipe', 'Position', 'Passes Décisives', 'Performance Passes']
-            ].copy()
-            top_assisters['Label'] = top_assisters['Joueur'] + ' (' + top_assisters['Équipe'] + ')'
-            
-            fig_top_assisters = px.bar(
-                top_assisters,
-                y='Label',
-                x='Passes Décisives',
-                orientation='h',
-                title='Top 15 passeurs',
-                text='Passes Décisives',
-                color='Position',
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hover_data=['Joueur', 'Équipe', 'Position', 'Passes Décisives', 'Performance Passes']
-            )
-            fig_top_assisters.update_traces(texttemplate='%{text}', textposition='outside')
-            fig_top_assisters.update_layout(
-                yaxis=dict(autorange='reversed'),
-                height=500,
-                yaxis_title="",
-                xaxis_title="Nombre de passes décisives"
-            )
-            st.plotly_chart(fig_top_assisters, width='stretch')
-        
-        st.caption("Joueurs ayant joué au moins 5 matchs")
-        top_contributions = df_filtered[df_filtered['Matchs Joués'] >= 5].nlargest(20, 'Performance Buts plus Passes')
-        
-        if not top_contributions.empty:
-            top_contributions_display = top_contributions.copy()
-            top_contributions_display['Label'] = top_contributions_display['Joueur'] + ' (' + top_contributions_display['Équipe'] + ')'
-            
-            fig_top_contrib = px.bar(
-                top_contributions_display,
-                y='Label',
-                x='Performance Buts plus Passes',
-                orientation='h',
-                title='Top 20 contributions offensives totales',
-                text='Performance Buts plus Passes',
-                color='Position',
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hover_data=['Joueur', 'Équipe', 'Position', 'Matchs Joués', 'Performance Buts', 'Performance Passes']
-            )
-            fig_top_contrib.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig_top_contrib.update_layout(
-                yaxis=dict(autorange='reversed'),
-                height=600,
-                yaxis_title="",
-                xaxis_title="Performance Buts + Passes"
-            )
-            st.plotly_chart(fig_top_contrib, width='stretch')
-        else:
-            st.info("Aucun joueur n'a joué au moins 5 matchs dans cette sélection.")
-    
-    st.markdown("---")
-    
-    # SECTION 4 : Tableau complet et export
-    st.subheader("Tableau complet et export")
 
+@st.fragment
+@profiled("classements")
+def rankings_section(total_rows):
+    player_totals = player_index.totals
+
+    col_top1, col_top2 = st.columns(2)
+
+    with col_top1:
+        top_scorers = player_totals.iloc[player_rankings.top('Buts', 15, total_rows)][
+            ['Joueur', 'Équipe', 'Position', 'Buts', 'Performance Buts']
+        ].copy()
+        top_scorers['Label'] = top_scorers['Joueur'] + ' (' + top_scorers['Équipe'].astype(str) + ')'
+
+        fig_top_scorers = px.bar(
+            top_scorers,
+            y='Label',
+            x='Buts',
+            orientation='h',
+            title='Top 15 buteurs',
+            text='Buts',
+            color='Position',
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            hover_data=['Joueur', 'Équipe', 'Position', 'Buts', 'Performance Buts']
+        )
+        fig_top_scorers.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_top_scorers.update_layout(
+            yaxis=dict(autorange='reversed'),
+            height=500,
+            yaxis_title="",
+            xaxis_title="Nombre de buts"
+        )
+        plotly_chart('top_scorers', fig_top_scorers, width='stretch')
+
+    with col_top2:
+        top_assisters = player_totals.iloc[player_rankings.top('Passes Décisives', 15, total_rows)][
+            ['Joueur', 'Équipe', 'Position', 'Passes Décisives', 'Performance Passes']
+        ].copy()
+        top_assisters['Label'] = top_assisters['Joueur'] + ' (' + top_assisters['Équipe'].astype(str) + ')'
+
+        fig_top_assisters = px.bar(
+            top_assisters,
+            y='Label',
+            x='Passes Décisives',
+            orientation='h',
+            title='Top 15 passeurs',
+            text='Passes Décisives',
+            color='Position',
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            hover_data=['Joueur', 'Équipe', 'Position', 'Passes Décisives', 'Performance Passes']
+        )
+        fig_top_assisters.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_top_assisters.update_layout(
+            yaxis=dict(autorange='reversed'),
+            height=500,
+            yaxis_title="",
+            xaxis_title="Nombre de passes décisives"
+        )
+        plotly_chart('top_assisters', fig_top_assisters, width='stretch')
+
+    st.caption("Joueurs ayant joué au moins 5 matchs")
+    top_contributions = player_totals.iloc[player_rankings.top('Performance Buts plus Passes', 20, total_rows, min_matches=5)]
+
+    if not top_contributions.empty:
+        top_contributions_display = top_contributions.copy()
+        top_contributions_display['Label'] = top_contributions_display['Joueur'] + ' (' + top_contributions_display['Équipe'].astype(str) + ')'
+
+        fig_top_contrib = px.bar(
+            top_contributions_display,
+            y='Label',
+            x='Performance Buts plus Passes',
+            orientation='h',
+            title='Top 20 contributions offensives totales',
+            text='Performance Buts plus Passes',
+            color='Position',
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            hover_data=['Joueur', 'Équipe', 'Position', 'Matchs Joués', 'Performance Buts', 'Performance Passes']
+        )
+        fig_top_contrib.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        fig_top_contrib.update_layout(
+            yaxis=dict(autorange='reversed'),
+            height=600,
+            yaxis_title="",
+            xaxis_title="Performance Buts + Passes"
+        )
+        plotly_chart('top_contrib', fig_top_contrib, width='stretch')
+    else:
+        st.info("Aucun joueur n'a joué au moins 5 matchs dans cette sélection.")
+
+    # Classement libre : n'importe quel indicateur numérique, seuil de minutes réglable
+    st.markdown("#### Classement personnalisé")
+    ranking_metrics = [
+        col for col in player_totals.columns
+        if pd.api.types.is_numeric_dtype(player_totals[col]) and col not in ('Rk', 'Born', 'Passages')
+    ]
+    ranking_cols = st.columns([2, 1, 1])
+    ranking_metric = ranking_cols[0].selectbox(
+        "Indicateur",
+        options=ranking_metrics,
+        index=ranking_metrics.index('Performance xG'),
+        key="ranking_metric"
+    )
+    ranking_size = ranking_cols[1].slider("Nombre de joueurs", 5, 50, 20, key="ranking_size")
+    ranking_minutes = ranking_cols[2].number_input("Minutes minimum", 0, 3500, 900, step=90, key="ranking_minutes")
+
+    ranking_rows = player_rankings.top(ranking_metric, ranking_size, total_rows, min_minutes=ranking_minutes)
+    if len(ranking_rows):
+        ranking_df = player_totals.iloc[ranking_rows][['Joueur', 'Équipe', 'Ligue', 'Position', 'Minutes', ranking_metric]]
+        ranking_df.insert(0, 'Rang', np.arange(1, len(ranking_df) + 1))
+        if ranking_metric + GLOBAL_SUFFIX in player_percentiles.columns:
+            ranking_df['Centile saison'] = player_percentiles[ranking_metric + GLOBAL_SUFFIX].to_numpy(dtype='float64')[ranking_rows].round(1)
+        st.dataframe(ranking_df.round(3), hide_index=True, width='stretch')
+    else:
+        st.info(f"Aucun joueur n'a joué au moins {ranking_minutes} minutes dans cette sélection.")
+
+
+@st.fragment
+@profiled("tableau et export")
+def table_section(filter_key, filter_rows):
     base_columns = [
         'Joueur', 'Âge', 'Équipe', 'Ligue', 'Position', 'Matchs Joués', 'Minutes',
         'Buts', 'Passes Décisives', 'Buts par Match', 'Passes Déc par Match',
         'Minutes par Match', 'Performance Buts', 'Performance Passes', 'Performance Buts plus Passes',
         'Performance xG', 'Performance xAG'
     ]
-    available_columns = [col for col in base_columns if col in df_filtered.columns]
-    display_df = df_filtered[available_columns].copy()
-
-    if not display_df.empty:
-        round_columns = [
-            'Buts par Match', 'Passes Déc par Match', 'Minutes par Match',
-            'Performance Buts', 'Performance Passes', 'Performance Buts plus Passes', 'Performance xG', 'Performance xAG'
-        ]
-        for column in round_columns:
-            if column in display_df.columns:
-                display_df[column] = display_df[column].round(3)
-        if 'Minutes par Match' in display_df.columns:
-            display_df['Minutes par Match'] = display_df['Minutes par Match'].round(1)
-
-        sort_columns = [col for col in ['Performance Buts plus Passes', 'Buts'] if col in display_df.columns]
-        if sort_columns:
-            display_df = display_df.sort_values(sort_columns, ascending=[False] + [False] * (len(sort_columns) - 1))
-
+    available_columns = [col for col in base_columns if col in df.columns]
+    if len(filter_rows):
         table_search = st.text_input(
             "Filtrer le tableau (nom, équipe ou ligue)",
             placeholder="Exemple : Madrid",
@@ -861,14 +1060,26 @@ with tab_details:
         )
 
         if table_search:
-            mask = (
-                display_df['Joueur'].str.contains(table_search, case=False, na=False) |
-                display_df['Équipe'].str.contains(table_search, case=False, na=False) |
-                display_df['Ligue'].str.contains(table_search, case=False, na=False)
-            )
-            filtered_table_df = display_df[mask]
+            # Lignes triées par pertinence, restreintes aux lignes filtrées
+            table_rows, _ = load_search_index().search(table_search, rows=filter_rows)
         else:
-            filtered_table_df = display_df
+            # Lignes filtrées dans l'ordre du classement précalculé (pas de tri à chaque rerun)
+            table_rows = row_rankings.sorted_rows(('Performance Buts plus Passes', 'Buts'), filter_rows)
+
+        # Seules les colonnes affichées sont extraites, pour les seules lignes affichées
+        filtered_table_df = df[available_columns].iloc[table_rows]
+        if row_roles is not None:
+            filtered_table_df.insert(available_columns.index('Position') + 1, 'Rôle', row_roles[table_rows])
+
+        round_columns = [
+            'Buts par Match', 'Passes Déc par Match', 'Minutes par Match',
+            'Performance Buts', 'Performance Passes', 'Performance Buts plus Passes', 'Performance xG', 'Performance xAG'
+        ]
+        for column in round_columns:
+            if column in filtered_table_df.columns:
+                filtered_table_df[column] = filtered_table_df[column].round(3)
+        if 'Minutes par Match' in filtered_table_df.columns:
+            filtered_table_df['Minutes par Match'] = filtered_table_df['Minutes par Match'].round(1)
 
         st.dataframe(
             filtered_table_df,
@@ -877,16 +1088,169 @@ with tab_details:
             height=400
         )
 
-        csv = filtered_table_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Télécharger les données filtrées (CSV)",
-            data=csv,
-            file_name='joueurs_filtres.csv',
-            mime='text/csv'
+        export_cols = st.columns([1, 2], vertical_alignment='bottom')
+        export_format = export_cols[0].selectbox(
+            "Format d'export",
+            options=list(EXPORT_FORMATS),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+            key="export_format"
         )
+        # Le fichier n'est produit qu'au clic (fonction appelée par Streamlit), puis gardé
+        # pour le même filtre, la même recherche et le même format
+        export_key = (filter_key, table_search, role_stamp)
+        with export_cols[1]:
+            st.download_button(
+                label=f"Télécharger les données filtrées ({EXPORT_FORMATS[export_format]['label']})",
+                data=lambda: export_cache().payload(export_key, filtered_table_df, export_format),
+                file_name=export_name('joueurs_filtres.csv', export_format),
+                mime=EXPORT_FORMATS[export_format]['mime'],
+                on_click='ignore'
+            )
     else:
         st.write("Aucun joueur à afficher dans le tableau.")
 
+
+with tab_details:
+    st.header("Analyse joueurs")
+
+    # Onglet fermé : aucune section n'est exécutée (fiche, comparateur, classements, tableau)
+    if not tab_details.open:
+        keep_widget_state(DETAILS_WIDGETS)
+    else:
+        if df_filtered.empty:
+            st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+        else:
+            total_rows, player_options = player_choices(filter_key, filter_rows)
+
+            # Radars en centiles (fiche et comparateur) : lisibles quel que soit le poste, échelle
+            # commune 0-100
+            percentile_scope = st.radio(
+                "Centiles calculés par rapport aux joueurs",
+                options=["de la même ligue et du même poste", "de toute la saison"],
+                horizontal=True,
+                key="percentile_scope"
+            )
+            percentile_suffix = GLOBAL_SUFFIX if percentile_scope == "de toute la saison" else ''
+
+            # SECTION 1 : Recherche et fiche individuelle
+            st.subheader("Recherche et fiche joueur")
+
+            if not player_options:
+                st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+            else:
+                player_card_section(filter_rows, total_rows, player_options, percentile_suffix)
+
+                st.markdown("---")
+
+                # SECTION 2 : Comparateur de joueurs
+                st.subheader("Comparateur de joueurs")
+                comparator_section(player_options, percentile_suffix)
+
+            st.markdown("---")
+
+            # SECTION 3 : Classements et tops
+            st.subheader("Classements et tops")
+            rankings_section(total_rows)
+
+        st.markdown("---")
+
+        # SECTION 4 : Tableau complet et export
+        st.subheader("Tableau complet et export")
+        table_section(filter_key, filter_rows)
+
+
+# Widgets de l'onglet "Rôles", conservés quand l'onglet est fermé
+ROLE_WIDGETS = ['role_features', 'role_auto_k', 'role_k']
+
+
+# Ajustement en cours : rien n'attend le thread, ce fragment vérifie seul (run_every) si le
+# résultat est prêt, puis relance l'application pour afficher la carte
+@st.fragment(run_every=ROLE_POLL_SECONDS)
+def role_fit_pending(future):
+    if future.done():
+        st.rerun()
+    st.info("⏳ Clustering en cours... La carte s'affichera dès la fin du calcul, les autres onglets restent utilisables.")
+
+
+# Fragment : changer les indicateurs ou K ne relance que cette section
+@st.fragment
+@profiled("onglet rôles")
+def role_section(filter_key, filter_rows):
+    player_totals = player_index.totals
+    role_rows = player_index.totals_rows(filter_rows)
+    st.caption("K-means sur les indicateurs standardisés des joueurs filtrés (une entrée par joueur et par saison), projection PCA en deux dimensions")
+
+    control_cols = st.columns([3, 1, 1])
+    role_features = control_cols[0].multiselect(
+        "Indicateurs",
+        options=ROLE_FEATURES,
+        default=ROLE_FEATURES,
+        format_func=lambda feature: COLUMN_NAMES.get(feature, feature),
+        key="role_features"
+    )
+    auto_k = control_cols[1].checkbox("K automatique", value=True, key="role_auto_k", help="Nombre de rôles choisi par silhouette (3 à 8)")
+    role_k = control_cols[2].slider("Nombre de rôles", 2, 8, 4, key="role_k", disabled=auto_k)
+    n_clusters = None if auto_k else role_k
+
+    if len(role_features) < 2:
+        st.info("Sélectionnez au moins deux indicateurs.")
+        return
+    if len(role_rows) < ROLE_MIN_PLAYERS:
+        st.info(f"Au moins {ROLE_MIN_PLAYERS} joueurs sont nécessaires pour le clustering ({len(role_rows)} avec les filtres actuels).")
+        return
+
+    key = (filter_key, tuple(role_features), n_clusters)
+    population = player_totals.iloc[role_rows]
+    future = submit_role_fit(key, population, role_features, n_clusters)
+    if not future.done():
+        role_fit_pending(future)
+        return
+    try:
+        fit = future.result()
+    except ValueError as error:
+        discard_role_fit(key)
+        st.warning(f"Clustering impossible sur cette sélection : {error}")
+        return
+
+    model = fit['model']
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("Joueurs", len(role_rows))
+    metric_cols[1].metric("Rôles", model.n_clusters)
+    metric_cols[2].metric("Calcul", f"{fit['seconds']:.2f} s")
+    if model.k_scores is not None:
+        with st.expander("Choix de K (silhouette et inertie)"):
+            st.dataframe(model.k_scores.round(3), hide_index=True, width='stretch')
+
+    map_df = population[['Joueur', 'Équipe', 'Ligue', 'Position']].reset_index(drop=True)
+    map_df['Rôle'] = fit['roles']
+    map_df['PC1'] = fit['coords'][:, 0]
+    map_df['PC2'] = fit['coords'][:, 1]
+    fig_roles = px.scatter(
+        map_df,
+        x='PC1',
+        y='PC2',
+        color='Rôle',
+        hover_name='Joueur',
+        hover_data={'Équipe': True, 'Ligue': True, 'Position': True, 'PC1': False, 'PC2': False},
+        title='Carte des rôles (projection PCA)'
+    )
+    fig_roles.update_layout(height=550)
+    plotly_chart('roles', fig_roles, width='stretch')
+
+    st.subheader("Profil moyen par rôle")
+    st.dataframe(fit['summary'].round(2), hide_index=True, width='stretch')
+
+
+with tab_roles:
+    st.header("Rôles des joueurs")
+
+    if df_filtered.empty:
+        st.write("Aucun joueur ne correspond aux filtres sélectionnés.")
+    elif tab_roles.open:
+        role_section(filter_key, filter_rows)
+    else:
+        keep_widget_state(ROLE_WIDGETS)
+
 st.markdown("---")
 
 st.info("""
@@ -902,7 +1266,7 @@ st.info("""
 - Utilisez le bouton "Réinitialiser" pour revenir à la vue complète.
 
 *Navigation :*
-- Explorez les 4 onglets pour différentes analyses : vue d'ensemble, performances, ligues et joueurs.
+- Explorez les 5 onglets pour différentes analyses : vue d'ensemble, performances, ligues, joueurs et rôles.
 - Survolez les graphiques pour plus d'informations (zoom, détails, légendes interactives).
 - Téléchargez les données filtrées en CSV depuis l'onglet "Analyse joueurs".
 
@@ -914,3 +1278,7 @@ st.info("""
 - *Performance xAG* = Expected Assists (passes attendues statistiquement)
 - *Minutes par Match* = minutes ÷ matchs joués
 """)
+
+record = finish_rerun()
+if detailed():
+    render_overlay(record)
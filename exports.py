@@ -0,0 +1,112 @@
+import gzip
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# Export des tableaux en CSV, CSV compressé, Parquet ou Excel, pour le dashboard et le
+# script d'analyse. Le dashboard ne sérialise un tableau qu'au clic sur "Télécharger" :
+# le contenu est ensuite gardé par (état du filtre, format) dans un cache borné en taille,
+# partagé par toutes les sessions.
+
+EXPORT_FORMATS = {
+    'csv': {
+        'label': 'CSV',
+        'extension': '.csv',
+        'mime': 'text/csv'
+    },
+    'csv.gz': {
+        'label': 'CSV gzip',
+        'extension': '.csv.gz',
+        'mime': 'application/gzip'
+    },
+    'parquet': {
+        'label': 'Parquet',
+        'extension': '.parquet',
+        'mime': 'application/vnd.apache.parquet'
+    },
+    'xlsx': {
+        'label': 'Excel',
+        'extension': '.xlsx',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    }
+}
+
+# Taille maximale des contenus gardés en mémoire par le dashboard
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _csv(df, index):
+    return df.to_csv(index=index).encode('utf-8')
+
+
+def _csv_gz(df, index):
+    # mtime=0 : même tableau, même fichier (pas de date dans l'en-tête gzip)
+    return gzip.compress(_csv(df, index), compresslevel=6, mtime=0)
+
+
+def _parquet(df, index):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=index)
+    return buffer.getvalue()
+
+
+def _xlsx(df, index):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=index, engine='openpyxl')
+    return buffer.getvalue()
+
+
+WRITERS = {
+    'csv': _csv,
+    'csv.gz': _csv_gz,
+    'parquet': _parquet,
+    'xlsx': _xlsx
+}
+
+
+def serialize(df, fmt='csv', index=False):
+    return WRITERS[fmt](df, index)
+
+
+def export_name(file_name, fmt='csv'):
+    # "joueurs.csv" -> "joueurs.parquet"
+    stem = file_name[:-len('.csv')] if file_name.endswith('.csv') else file_name
+    return stem + EXPORT_FORMATS[fmt]['extension']
+
+
+def write_export(df, path, fmt='csv', index=False):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(serialize(df, fmt, index))
+    os.replace(tmp_path, path)
+    return path
+
+
+class PayloadCache:
+    # LRU des contenus sérialisés, borné par leur taille totale
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, make):
+        with self._lock:
+            if key in self._payloads:
+                self._payloads.move_to_end(key)
+                return self._payloads[key]
+
+        # Sérialisation hors du verrou : les autres téléchargements ne sont pas bloqués
+        payload = make()
+        with self._lock:
+            if key not in self._payloads and len(payload) <= self.max_bytes:
+                self._payloads[key] = payload
+                self.size += len(payload)
+                while self.size > self.max_bytes:
+                    _, dropped = self._payloads.popitem(last=False)
+                    self.size -= len(dropped)
+        return payload
+
+    def payload(self, key, df, fmt='csv', index=False):
+        return self.get((key, fmt), lambda: serialize(df, fmt, index))
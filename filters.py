@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Index de filtrage construit une fois par jeu de données : un bitmap par saison, par
+# ligue et par position, et un ordre trié pour chaque colonne numérique filtrable. Une requête de la
+# barre latérale se résout en intersectant ces ensembles de lignes, et les dernières
+# combinaisons de filtres sont gardées en cache (LRU).
+
+RANGE_COLUMNS = ['Âge', 'Matchs Joués', 'Buts']
+
+
+def query_key(leagues=(), positions=(), age_range=None, mp_range=None, min_goals=0, seasons=()):
+    return (
+        tuple(sorted(leagues)),
+        tuple(sorted(positions)),
+        tuple(age_range) if age_range is not None else None,
+        tuple(mp_range) if mp_range is not None else None,
+        min_goals,
+        tuple(sorted(seasons))
+    )
+
+
+class FilterIndex:
+    def __init__(self, df, max_cached=64):
+        self.size = len(df)
+        self.max_cached = max_cached
+        self._leagues = self._value_bitmaps(df['Ligue'])
+        self._positions = self._value_bitmaps(df['Position'])
+        self._seasons = self._value_bitmaps(df['Saison']) if 'Saison' in df.columns else {}
+        self._sorted = {column: self._sorted_index(df[column]) for column in RANGE_COLUMNS}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _value_bitmaps(series):
+        codes, uniques = pd.factorize(series)
+        return {value: codes == i for i, value in enumerate(uniques)}
+
+    @staticmethod
+    def _sorted_index(series):
+        values = series.to_numpy()
+        order = np.argsort(values, kind='stable')
+        return values[order], order
+
+    def bounds(self, column):
+        values, _ = self._sorted[column]
+        return values[0], values[-1]
+
+    def _values_mask(self, bitmaps, selected):
+        mask = np.zeros(self.size, dtype=bool)
+        for value in selected:
+            if value in bitmaps:
+                mask |= bitmaps[value]
+        return mask
+
+    def _range_mask(self, column, low, high):
+        values, order = self._sorted[column]
+        if low <= values[0] and high >= values[-1]:
+            return None
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def _compute(self, key):
+        leagues, positions, age_range, mp_range, min_goals, seasons = key
+        masks = []
+        if seasons:
+            masks.append(self._values_mask(self._seasons, seasons))
+        if leagues:
+            masks.append(self._values_mask(self._leagues, leagues))
+        if positions:
+            masks.append(self._values_mask(self._positions, positions))
+        for column, bounds in (('Âge', age_range), ('Matchs Joués', mp_range)):
+            if bounds is not None:
+                masks.append(self._range_mask(column, *bounds))
+        if min_goals:
+            masks.append(self._range_mask('Buts', min_goals, np.inf))
+
+        masks = [mask for mask in masks if mask is not None]
+        if not masks:
+            return np.arange(self.size)
+        return np.flatnonzero(np.logical_and.reduce(masks))
+
+    def rows(self, leagues=(), positions=(), age_range=None, mp_range=None, min_goals=0, seasons=()):
+        key = query_key(leagues, positions, age_range, mp_range, min_goals, seasons)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        rows = self._compute(key)
+        rows.flags.writeable = False
+        with self._lock:
+            self._cache[key] = rows
+            if len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return rows
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Indicateurs dérivés communs au dashboard et au script d'analyse, déclarés une seule fois :
+# colonnes d'entrée (colonnes brutes du CSV ou autres indicateurs), opération et valeur
+# donnée quand le dénominateur est nul. MetricFrame les calcule colonne par colonne, en une
+# opération vectorisée, au premier accès seulement, puis les garde : le dashboard en garde
+# une par jeu de données chargé, partagée par toutes les sessions.
+
+METRICS = {
+    'Buts par Match': {'op': 'ratio', 'inputs': ['Gls', 'MP'], 'zero_division': 0},
+    'Passes Déc par Match': {'op': 'ratio', 'inputs': ['Ast', 'MP'], 'zero_division': 0},
+    'Minutes par Match': {'op': 'ratio', 'inputs': ['Min', 'MP'], 'zero_division': 0},
+    'starter_ratio': {'op': 'ratio', 'inputs': ['Starts', 'MP'], 'zero_division': np.nan},
+    'G+A': {'op': 'sum', 'inputs': ['Gls', 'Ast']},
+    'conv_Gls_xG': {'op': 'ratio', 'inputs': ['Gls', 'xG'], 'zero_division': np.nan},
+    'conv_Ast_xAG': {'op': 'ratio', 'inputs': ['Ast', 'xAG'], 'zero_division': np.nan},
+    'PrgP_xAG': {'op': 'sum', 'inputs': ['PrgP', 'xAG']},
+    'Niveau Expérience': {
+        'op': 'bins',
+        'inputs': ['MP'],
+        # Intervalles [début, fin) : 1-10, 11-20, 21-30 et 31 matchs ou plus
+        'bins': [0, 10, 20, 30, np.inf],
+        'labels': ['Débutant (1-10)', 'Intermédiaire (11-20)', 'Confirmé (21-30)', 'Expert (31+)']
+    }
+}
+
+
+def _ratio(columns, spec):
+    numerator, denominator = (column.to_numpy(dtype='float64', na_value=np.nan) for column in columns)
+    result = np.full(len(numerator), spec['zero_division'], dtype='float64')
+    return np.divide(numerator, denominator, out=result, where=denominator != 0)
+
+
+def _sum(columns, spec):
+    return sum(columns[1:], columns[0])
+
+
+def _bins(columns, spec):
+    return pd.cut(columns[0], bins=spec['bins'], labels=spec['labels'], right=False, include_lowest=True)
+
+
+OPERATIONS = {
+    'ratio': _ratio,
+    'sum': _sum,
+    'bins': _bins
+}
+
+
+class MetricFrame:
+    # Indicateurs dérivés de df, sans modifier df. aliases : noms des colonnes brutes dans
+    # df quand il utilise d'autres noms (players_data.COLUMN_NAMES pour le frame dashboard)
+    def __init__(self, df, aliases=None):
+        self.df = df
+        self.aliases = aliases or {}
+        self._columns = {}
+
+    def __getitem__(self, name):
+        if name in self._columns:
+            return self._columns[name]
+        if name not in METRICS:
+            return self.df[name if name in self.df.columns else self.aliases.get(name, name)]
+
+        spec = METRICS[name]
+        values = OPERATIONS[spec['op']]([self[column] for column in spec['inputs']], spec)
+        if not isinstance(values, pd.Series):
+            values = pd.Series(values, index=self.df.index)
+        # Deux sessions peuvent calculer la même colonne en même temps : même résultat
+        self._columns[name] = values.rename(name)
+        return self._columns[name]
+
+    def frame(self, names):
+        return pd.DataFrame({name: self[name] for name in names})
+
+
+def add_metrics(df, names, aliases=None):
+    # Copie paresseuse de df (copy-on-write) avec les indicateurs demandés
+    metrics = MetricFrame(df, aliases)
+    return df.assign(**{name: metrics[name] for name in names})
@@ -0,0 +1,37 @@
+import pandas as pd
+
+# Rangs centiles (0-100) de chaque indicateur numérique, au sein du groupe ligue × poste
+# principal et sur toute la saison. Calculés en une passe vectorisée sur les totaux de
+# saison des joueurs (voir player_index.py), un fichier de saison à la fois : players_data
+# met le résultat en cache par fichier, seules les saisons nouvelles ou modifiées sont
+# recalculées.
+
+# Colonnes numériques qui ne sont pas des indicateurs de performance
+EXCLUDED_COLUMNS = ['Rk', 'Born', 'Âge', 'Passages']
+
+GLOBAL_SUFFIX = ' (global)'
+
+
+def percentile_metrics(df):
+    return [
+        column for column in df.columns
+        if pd.api.types.is_numeric_dtype(df[column]) and column not in EXCLUDED_COLUMNS
+    ]
+
+
+def primary_position(positions):
+    # "AT,MI" -> "AT" : les postes combinés rejoignent le groupe de leur premier poste
+    return positions.astype(str).str.split(',').str[0]
+
+
+def percentile_table(totals, metrics=None):
+    metrics = metrics or percentile_metrics(totals)
+    values = totals[metrics]
+    groups = [totals['Ligue principale'], primary_position(totals['Position'])]
+
+    by_group = values.groupby(groups, observed=True).rank(pct=True) * 100
+    overall = values.rank(pct=True) * 100
+
+    table = pd.concat([by_group, overall.add_suffix(GLOBAL_SUFFIX)], axis=1).astype('float32')
+    table.insert(0, 'ID Joueur', totals['ID Joueur'].to_numpy())
+    return table
@@ -0,0 +1,116 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Index des joueurs du frame dashboard. Un joueur transféré en cours de saison apparaît
+# sur une ligne par club : l'index lui donne un identifiant stable (nom + année de
+# naissance + nationalité), garde ses lignes d'origine et construit une vue "totaux de
+# saison" (une ligne par joueur et par saison) avec les taux recalculés.
+
+# Totaux additionnés entre les passages d'un joueur dans plusieurs clubs
+SUM_COLUMNS = [
+    'Matchs Joués', 'Titularisations', 'Minutes', 'Matchs 90', 'Buts', 'Passes Décisives',
+    'Buts plus Passes', 'G-PK', 'PK', 'PKatt', 'CrdY', 'CrdR', 'xG', 'npxG', 'xAG',
+    'npxG plus xAG', 'Courses Progressives', 'Passes Progressives', 'Conduites Progressives'
+]
+
+# Taux par 90 minutes recalculés à partir des totaux (somme des colonnes ÷ Matchs 90)
+PER90_RATES = {
+    'Performance Buts': ['Buts'],
+    'Performance Passes': ['Passes Décisives'],
+    'Performance Buts plus Passes': ['Buts plus Passes'],
+    'Performance Buts sans Pénalty': ['G-PK'],
+    'Performance Buts plus Passes sans Pénalty': ['G-PK', 'Passes Décisives'],
+    'Performance xG': ['xG'],
+    'Performance xAG': ['xAG'],
+    'Performance xG plus xAG': ['xG', 'xAG'],
+    'Performance npxG': ['npxG'],
+    'Performance npxG plus xAG': ['npxG plus xAG']
+}
+
+PER_MATCH_RATES = {
+    'Buts par Match': 'Buts',
+    'Passes Déc par Match': 'Passes Décisives',
+    'Minutes par Match': 'Minutes'
+}
+
+# Clubs et ligues de tous les passages, joints dans l'ordre du fichier
+JOINED_COLUMNS = ['Équipe', 'Ligue']
+
+
+def _stable_id(key):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def player_ids(df):
+    keys = (
+        df['Joueur'].astype(str) + '|'
+        + df['Born'].fillna(0).astype('int64').astype(str) + '|'
+        + df['Nationalité'].astype(str)
+    )
+    return keys.map(_stable_id).to_numpy()
+
+
+def _rate(numerator, denominator):
+    denominator = denominator.where(denominator != 0)
+    return (numerator / denominator).fillna(0).astype('float32')
+
+
+class PlayerIndex:
+    def __init__(self, df):
+        ids = player_ids(df)
+        seasons = df['Saison'].astype(str).to_numpy() if 'Saison' in df.columns else np.full(len(df), '')
+        # Une entrée par joueur et par saison ; total_of_row donne l'entrée de chaque ligne de df
+        self.total_of_row, _ = pd.factorize(pd.Series(ids) + '|' + seasons)
+        self.rows_by_id = pd.Series(ids).groupby(ids).indices
+
+        # Ligne représentative (âge, poste, ...) : le passage avec le plus de minutes
+        minutes = pd.Series(df['Minutes'].to_numpy())
+        representative = minutes.groupby(self.total_of_row).idxmax().to_numpy()
+        totals = df.iloc[representative].reset_index(drop=True)
+        totals.insert(0, 'ID Joueur', ids[representative])
+        # Ligue du passage principal, pour les regroupements (Ligue est jointe pour les transferts)
+        totals['Ligue principale'] = totals['Ligue']
+
+        stints = np.bincount(self.total_of_row)
+        in_merged = stints[self.total_of_row] > 1
+        if in_merged.any():
+            self._merge_stints(totals, df[in_merged], self.total_of_row[in_merged])
+
+        totals['Passages'] = stints.astype('int16')
+        self.totals = totals
+
+        labels = totals['Joueur'].astype(str) + ' (' + totals['Équipe'].astype(str) + ')'
+        self.labels = labels.to_numpy()
+        if 'Saison' in totals.columns:
+            self.season_labels = (labels + ' – ' + totals['Saison'].astype(str)).to_numpy()
+        else:
+            self.season_labels = self.labels
+
+    @staticmethod
+    def _merge_stints(totals, stints, codes):
+        merged = np.unique(codes)
+
+        sums = stints[SUM_COLUMNS].groupby(codes).sum()
+        for column in SUM_COLUMNS:
+            totals.loc[merged, column] = sums[column].to_numpy()
+
+        for column in JOINED_COLUMNS:
+            joined = stints[column].astype(str).groupby(codes).agg(lambda values: ' / '.join(dict.fromkeys(values)))
+            values = totals[column].astype(str).to_numpy(dtype=object)
+            values[merged] = joined.to_numpy()
+            totals[column] = pd.Categorical(values)
+
+        rows = totals.loc[merged]
+        for column, parts in PER90_RATES.items():
+            totals.loc[merged, column] = _rate(rows[parts].sum(axis=1), rows['Matchs 90']).to_numpy()
+        for column, numerator in PER_MATCH_RATES.items():
+            totals.loc[merged, column] = _rate(rows[numerator], rows['Matchs Joués']).to_numpy()
+
+    def totals_rows(self, rows):
+        # Entrées de la vue totaux couvertes par des lignes de df (par ex. un filtre)
+        return np.unique(self.total_of_row[rows])
+
+    def player_rows(self, player_id):
+        return self.rows_by_id[player_id]
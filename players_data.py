@@ -0,0 +1,251 @@
+import glob
+import hashlib
+import os
+import re
+
+import pandas as pd
+
+from metrics import add_metrics
+from percentiles import percentile_table
+from player_index import PlayerIndex
+from schema import apply_schema
+from translations import translate_nations, translate_positions
+
+# Chargement commun des données joueurs pour le dashboard et le script d'analyse.
+# Chaque variante préparée est stockée une seule fois au format Arrow IPC (non compressé,
+# donc lisible par memory-map) et indexée sur le hash du CSV source. Les colonnes lues
+# depuis ce cache pointent directement dans le fichier memory-mappé (lecture seule) : les
+# pages sont partagées par tous les processus qui lisent le même fichier.
+
+PATH = 'top5-players24-25.csv'
+DATA_DIR = '.'
+SEASON_PATTERN = 'top5-players*.csv'
+CACHE_DIR = '.cache'
+
+# Taille des blocs pour la lecture en streaming : la mémoire maximale dépend de ce
+# paramètre et non de la taille du fichier
+CHUNK_SIZE = 100_000
+
+TEXT_COLUMNS = ['Player', 'Nation', 'Pos', 'Squad', 'Comp']
+
+# À incrémenter dès que la préparation change, pour invalider les caches existants
+CACHE_VERSION = 4
+
+COLUMN_NAMES = {
+    'Player': 'Joueur',
+    'Nation': 'Nationalité',
+    'Squad': 'Équipe',
+    'Comp': 'Ligue',
+    'Age': 'Âge',
+    '90s': 'Matchs 90',
+    'Pos': 'Position',
+    'MP': 'Matchs Joués',
+    'Starts': 'Titularisations',
+    'Min': 'Minutes',
+    'Gls': 'Buts',
+    'Ast': 'Passes Décisives',
+    'G+A': 'Buts plus Passes',
+    'xG': 'xG',
+    'xAG': 'xAG',
+    'PrgC': 'Courses Progressives',
+    'PrgP': 'Passes Progressives',
+    'PrgR': 'Conduites Progressives',
+    'Gls_90': 'Performance Buts',
+    'Ast_90': 'Performance Passes',
+    'G+A_90': 'Performance Buts plus Passes',
+    'G-PK_90': 'Performance Buts sans Pénalty',
+    'G+A-PK_90': 'Performance Buts plus Passes sans Pénalty',
+    'xG_90': 'Performance xG',
+    'xAG_90': 'Performance xAG',
+    'xG+xAG_90': 'Performance xG plus xAG',
+    'npxG': 'npxG',
+    'npxG_90': 'Performance npxG',
+    'npxG+xAG': 'npxG plus xAG',
+    'npxG+xAG_90': 'Performance npxG plus xAG',
+    'Buts par Match': 'Buts par Match',
+    'Passes_Dec_par_Match': 'Passes Déc par Match'
+}
+
+# Indicateurs dérivés (metrics.py) stockés avec le frame dashboard dans le cache Arrow
+DASHBOARD_METRICS = ['Buts par Match', 'Passes Déc par Match', 'Minutes par Match']
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def prepare_dashboard_frame(df):
+    df_cleaned = add_metrics(df.dropna(), DASHBOARD_METRICS)
+    df_cleaned = df_cleaned.rename(columns=COLUMN_NAMES)
+
+    df_cleaned['Position'] = translate_positions(df_cleaned['Position'])
+    df_cleaned['Nationalité'] = translate_nations(df_cleaned['Nationalité'])
+
+    numeric_columns = [
+        'Buts par Match', 'Passes Déc par Match', 'Minutes par Match',
+        'Performance Buts', 'Performance Passes', 'Performance Buts plus Passes',
+        'Performance xG', 'Performance xAG', 'Performance xG plus xAG'
+    ]
+    existing_numeric = [col for col in numeric_columns if col in df_cleaned.columns]
+    df_cleaned[existing_numeric] = df_cleaned[existing_numeric].apply(pd.to_numeric, errors='coerce').fillna(0)
+
+    return apply_schema(df_cleaned, COLUMN_NAMES)
+
+
+BUILDERS = {
+    'raw': apply_schema,
+    'dashboard': prepare_dashboard_frame
+}
+
+
+def prepare_percentiles(df):
+    return percentile_table(PlayerIndex(df).totals)
+
+
+# Variantes calculées sur le frame complet d'une autre variante du même fichier (et non
+# bloc par bloc) : (variante source, fonction de construction)
+DERIVED_VARIANTS = {
+    'percentiles': ('dashboard', prepare_percentiles)
+}
+
+SEASON_COLUMNS = {
+    'raw': 'Season',
+    'dashboard': 'Saison',
+    'percentiles': 'Saison'
+}
+
+
+def _cache_path(path, variant, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}.{variant}.v{CACHE_VERSION}.{digest}.arrow")
+
+
+def _drop_stale_caches(cache_path):
+    prefix = os.path.basename(cache_path).rsplit('.', 3)[0] + '.'
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and name != os.path.basename(cache_path):
+            os.remove(os.path.join(CACHE_DIR, name))
+
+
+def _concat_frames(frames, ignore_index=True):
+    # Aligne les catégories avant concaténation pour que les colonnes restent catégorielles
+    if len(frames) == 1:
+        return frames[0]
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.Index(sorted(set().union(*(frame[column].cat.categories for frame in frames))))
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=ignore_index)
+
+
+def clean_chunk(chunk):
+    numeric_columns = chunk.columns.difference(TEXT_COLUMNS)
+    chunk[numeric_columns] = chunk[numeric_columns].apply(pd.to_numeric, errors='coerce')
+    return apply_schema(chunk.dropna())
+
+
+def read_chunks(path, prepare=None, row_filter=None, chunksize=CHUNK_SIZE):
+    # Chaque bloc est préparé (nettoyage, typage) puis filtré avant d'être conservé :
+    # le CSV brut n'est jamais matérialisé en entier à côté du frame final
+    frames = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if prepare is not None:
+            chunk = prepare(chunk)
+        if row_filter is not None:
+            chunk = chunk[row_filter(chunk)]
+        frames.append(chunk)
+    if not frames:
+        return pd.read_csv(path, nrows=0)
+    return _concat_frames(frames, ignore_index=False)
+
+
+def _cached(path, variant, make):
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return make()
+
+    cache_path = _cache_path(path, variant, file_hash(path))
+    if os.path.exists(cache_path):
+        # split_blocks : une colonne par bloc, sans consolidation (qui copierait les colonnes)
+        return feather.read_table(cache_path, memory_map=True).to_pandas(split_blocks=True)
+
+    df = make()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _drop_stale_caches(cache_path)
+    tmp_path = cache_path + '.tmp'
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+    return df
+
+
+def cached_frame(path, variant, build):
+    return _cached(path, variant, lambda: read_chunks(path, prepare=build))
+
+
+def load_variant(path, variant):
+    if variant in DERIVED_VARIANTS:
+        source, build = DERIVED_VARIANTS[variant]
+        return _cached(path, variant, lambda: build(load_variant(path, source)))
+    return cached_frame(path, variant, BUILDERS[variant])
+
+
+def load_raw(path=PATH):
+    return cached_frame(path, 'raw', BUILDERS['raw'])
+
+
+def load_dashboard_frame(path=PATH):
+    return cached_frame(path, 'dashboard', BUILDERS['dashboard'])
+
+
+# --- Plusieurs saisons --------------------------------------------------------
+# Un dossier de CSV par saison (top5-players23-24.csv, top5-players24-25.csv, ...).
+# Chaque fichier a son propre cache : au démarrage suivant, seuls les fichiers
+# nouveaux ou modifiés (hash différent) sont relus, les autres sont memory-mappés.
+
+def season_files(directory=DATA_DIR, pattern=SEASON_PATTERN):
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+def season_label(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = re.search(r'(\d{2})-(\d{2})$', stem)
+    if match is None:
+        return stem
+    return f"20{match.group(1)}-{match.group(2)}"
+
+
+def load_seasons(directory=DATA_DIR, variant='raw', pattern=SEASON_PATTERN):
+    paths = season_files(directory, pattern)
+    if not paths:
+        raise FileNotFoundError(f"Aucun fichier {pattern} dans {directory}")
+
+    labels = [season_label(path) for path in paths]
+    season_dtype = pd.CategoricalDtype(sorted(set(labels)), ordered=True)
+
+    frames = []
+    for path, label in zip(paths, labels):
+        frame = load_variant(path, variant)
+        frame.insert(0, SEASON_COLUMNS[variant], pd.Series(label, index=frame.index, dtype=season_dtype))
+        frames.append(frame)
+    return _concat_frames(frames)
+
+
+def load_clean(path=PATH, row_filter=None, chunksize=CHUNK_SIZE):
+    # Lecture en streaming sans cache, pour les fichiers trop gros pour tenir deux fois
+    # en mémoire : nettoyage, typage et filtre optionnel appliqués bloc par bloc
+    if not os.path.isdir(path):
+        return read_chunks(path, prepare=clean_chunk, row_filter=row_filter, chunksize=chunksize)
+
+    frames = []
+    for season_path in season_files(path):
+        frame = read_chunks(season_path, prepare=clean_chunk, row_filter=row_filter, chunksize=chunksize)
+        frame.insert(0, SEASON_COLUMNS['raw'], season_label(season_path))
+        frames.append(frame)
+    return _concat_frames(frames)
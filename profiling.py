@@ -0,0 +1,153 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Instrumentation du dashboard : durée de chaque étape d'un rerun (chargement, filtres,
+# agrégations, graphiques), écrite en JSON Lines dans un fichier local, une ligne par
+# rerun complet ou par rerun de fragment. Le mode détaillé (?profile=1 dans l'URL, ou
+# SOCCERSTATS_PROFILE=1) mesure aussi la taille JSON de chaque figure, ce qui la
+# sérialise une seconde fois, et affiche le profil du dernier rerun complet dans la barre
+# latérale ; un fragment relancé seul affiche le sien en bas de sa section (un fragment ne
+# peut pas écrire dans la barre latérale).
+
+# Chemin vide : aucun fichier écrit
+LOG_PATH = os.environ.get('SOCCERSTATS_PROFILE_LOG', os.path.join('logs', 'reruns.jsonl'))
+
+# Au-delà, le fichier est renommé en .1 (une seule génération conservée)
+MAX_LOG_BYTES = 10 * 1024 * 1024
+
+STATE_KEY = '_rerun_profile'
+
+_write_lock = threading.Lock()
+
+
+def detailed():
+    return os.environ.get('SOCCERSTATS_PROFILE') == '1' or st.query_params.get('profile') == '1'
+
+
+def current():
+    record = st.session_state.get(STATE_KEY)
+    return record if record is not None and record['open'] else None
+
+
+def start_rerun(kind='script', **context):
+    # Un rerun interrompu (widget modifié pendant l'exécution) est clos et journalisé tel quel
+    previous = st.session_state.get(STATE_KEY)
+    if previous is not None and previous['open']:
+        finish_rerun(previous, status='interrompu')
+
+    ctx = get_script_run_ctx()
+    record = {
+        'kind': kind,
+        'session': ctx.session_id if ctx is not None else None,
+        'started': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'spans': [],
+        'stack': [],
+        'open': True,
+        'start': time.perf_counter(),
+        **context
+    }
+    st.session_state[STATE_KEY] = record
+    return record
+
+
+def finish_rerun(record=None, status='ok', log_path=LOG_PATH):
+    record = record or current()
+    if record is None:
+        return None
+    record['open'] = False
+    record['status'] = status
+    record['total_s'] = round(time.perf_counter() - record['start'], 6)
+    write_record(record, log_path)
+    return record
+
+
+@contextmanager
+def span(name, **extra):
+    # extra (renvoyé au bloc) peut être complété pendant l'étape, par ex. par une taille.
+    # Les étapes imbriquées (graphiques d'un onglet) gardent le nom de l'étape englobante
+    record = current()
+    parent = record['stack'][-1] if record is not None and record['stack'] else None
+    if record is not None:
+        record['stack'].append(name)
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        if record is not None:
+            record['stack'].pop()
+            record['spans'].append({'name': name, 'parent': parent, 'seconds': round(time.perf_counter() - start, 6), **extra})
+
+
+def profiled(name):
+    # Pour les fragments : étape du rerun complet en cours, ou rerun à part entière quand
+    # le fragment est relancé seul
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current() is not None:
+                with span(name):
+                    return fn(*args, **kwargs)
+            record = start_rerun('fragment', fragment=name)
+            status = 'erreur'
+            try:
+                result = fn(*args, **kwargs)
+                status = 'ok'
+            finally:
+                finish_rerun(record, status)
+            if detailed():
+                with st.expander(f"⏱️ Profil du rerun de « {name} » : {record['total_s'] * 1000:.0f} ms"):
+                    render_spans(record)
+            return result
+        return wrapper
+    return decorate
+
+
+def plotly_chart(name, fig, **kwargs):
+    with span(f"graphique : {name}") as extra:
+        if detailed():
+            extra['json_bytes'] = len(fig.to_json())
+        st.plotly_chart(fig, **kwargs)
+
+
+def write_record(record, log_path=LOG_PATH):
+    if not log_path:
+        return
+    line = json.dumps({key: value for key, value in record.items() if key not in ('open', 'start', 'stack')}, ensure_ascii=False)
+    # Le journal ne doit jamais faire échouer un rerun
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+            if os.path.exists(log_path) and os.path.getsize(log_path) > MAX_LOG_BYTES:
+                os.replace(log_path, log_path + '.1')
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+    except OSError:
+        pass
+
+
+def render_spans(record):
+    spans = pd.DataFrame(record['spans'])
+    if spans.empty:
+        st.caption("Aucune étape mesurée.")
+        return
+    spans['parent'] = spans['parent'].fillna('')
+    spans['ms'] = (spans.pop('seconds') * 1000).round(1)
+    if 'json_bytes' in spans.columns:
+        spans['JSON (Ko)'] = (spans.pop('json_bytes') / 1024).round(1)
+    st.dataframe(spans.sort_values('ms', ascending=False), hide_index=True, width='stretch')
+
+
+def render_overlay(record):
+    with st.sidebar.expander(f"⏱️ Profil du dernier rerun complet : {record['total_s'] * 1000:.0f} ms", expanded=True):
+        st.caption("Non mis à jour quand une section est relancée seule : son profil s'affiche alors en bas de la section.")
+        render_spans(record)
+        st.caption(f"Journal : {LOG_PATH or 'désactivé'} (une ligne JSON par rerun)")
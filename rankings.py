@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+
+# Classements "top N pour l'indicateur M dans le filtre F". L'ordre décroissant de chaque
+# indicateur (ou combinaison d'indicateurs) est calculé une fois par jeu de données, à la
+# première demande ; une requête parcourt cet ordre par blocs et s'arrête dès que N lignes
+# satisfont le filtre et les seuils de temps de jeu.
+
+FIRST_BLOCK = 256
+
+
+def _descending_order(df, columns):
+    # Tri stable (égalités dans l'ordre des lignes, comme nlargest), valeurs manquantes en dernier
+    keys = []
+    for column in reversed(columns):
+        values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+        keys.append(-np.where(np.isnan(values), -np.inf, values))
+    return np.lexsort(keys)
+
+
+class RankingIndex:
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+        self._minutes = df['Minutes'].to_numpy()
+        self._matches = df['Matchs Joués'].to_numpy()
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def order(self, metrics):
+        # metrics : une colonne, ou un tuple de colonnes départagées dans l'ordre
+        key = (metrics,) if isinstance(metrics, str) else tuple(metrics)
+        with self._lock:
+            if key not in self._orders:
+                order = _descending_order(self.df, key)
+                order.flags.writeable = False
+                self._orders[key] = order
+            return self._orders[key]
+
+    def _mask(self, rows, min_minutes, min_matches):
+        if rows is None:
+            mask = np.ones(self.size, dtype=bool)
+        else:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows] = True
+        if min_minutes:
+            mask &= self._minutes >= min_minutes
+        if min_matches:
+            mask &= self._matches >= min_matches
+        return mask
+
+    def top(self, metrics, n=10, rows=None, min_minutes=0, min_matches=0):
+        # Positions (iloc) des n premières lignes parmi rows (toutes si None)
+        order = self.order(metrics)
+        mask = self._mask(rows, min_minutes, min_matches)
+
+        found, count = [], 0
+        start, block = 0, max(4 * n, FIRST_BLOCK)
+        while start < len(order) and count < n:
+            chunk = order[start:start + block]
+            chunk = chunk[mask[chunk]]
+            found.append(chunk)
+            count += len(chunk)
+            start += block
+            block *= 2
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)[:n]
+
+    def sorted_rows(self, metrics, rows=None, min_minutes=0, min_matches=0):
+        # Toutes les lignes retenues, dans l'ordre du classement (sans nouveau tri)
+        order = self.order(metrics)
+        return order[self._mask(rows, min_minutes, min_matches)[order]]
@@ -0,0 +1,247 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from players_data import COLUMN_NAMES
+
+# Clustering des rôles de joueurs : choix automatique de K, noms de rôles déduits des
+# centroïdes, MiniBatchKMeans pour les grandes populations (toutes saisons, tous âges).
+# Le modèle ajusté (scaler + k-means + PCA + noms) est sauvegardé avec la liste des
+# indicateurs et le hash des données d'ajustement : tant que ces données ne changent pas,
+# il est rechargé au lieu d'être réajusté, et les rôles restent identiques d'un lancement
+# à l'autre. assign_role affecte des joueurs (colonnes brutes ou du dashboard) à ce modèle.
+# scikit-learn n'est importé qu'à l'ajustement ou au rechargement d'un modèle.
+
+ROLE_FEATURES = ['Gls', 'G-PK', 'xG', 'Ast', 'xAG', 'PrgP', 'CrdY', 'Min']
+
+# Profil de chaque rôle : indicateurs dont le centroïde doit être relativement élevé
+ROLE_PROFILES = {
+    'Finisher': ['Gls', 'G-PK', 'xG'],
+    'Creator': ['Ast', 'xAG'],
+    'Playmaker': ['PrgP'],
+    'Defender': ['CrdY']
+}
+
+# Groupe au temps de jeu nettement inférieur à la moyenne (centroïde Min en écart-type)
+RESERVE_ROLE = 'Squad player'
+RESERVE_MAX_MINUTES = -0.25
+
+# K = 2 ne sépare que les joueurs peu utilisés des titulaires : la recherche commence à 3
+K_RANGE = range(3, 9)
+SAMPLE_SIZE = 5000
+MINIBATCH_THRESHOLD = 20000
+RANDOM_STATE = 42
+
+MODEL_PATH = os.path.join('models', 'roles.joblib')
+
+# À incrémenter dès que l'ajustement ou la classe RoleModel change : les modèles
+# sauvegardés avec une autre version sont réajustés
+MODEL_VERSION = 1
+
+# Erreurs d'un fichier de modèle absent, tronqué ou écrit par une autre version du code
+MODEL_LOAD_ERRORS = (OSError, EOFError, AttributeError, ImportError, IndexError, KeyError, ValueError, pickle.UnpicklingError)
+
+
+def make_kmeans(n_clusters, n_rows, random_state=RANDOM_STATE):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if n_rows > MINIBATCH_THRESHOLD:
+        return MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=random_state)
+    return KMeans(n_clusters=n_clusters, random_state=random_state)
+
+
+def choose_k(X, k_range=K_RANGE, sample_size=SAMPLE_SIZE, random_state=RANDOM_STATE):
+    # Silhouette et inertie mesurées sur un échantillon ; K retenu = meilleure silhouette
+    from sklearn.metrics import silhouette_score
+
+    if len(X) > sample_size:
+        rng = np.random.default_rng(random_state)
+        X = X[rng.choice(len(X), sample_size, replace=False)]
+
+    scores = []
+    for k in k_range:
+        if k >= len(X):
+            break
+        model = make_kmeans(k, len(X), random_state).fit(X)
+        scores.append({
+            'K': k,
+            'Inertie': model.inertia_,
+            'Silhouette': silhouette_score(X, model.labels_)
+        })
+    scores = pd.DataFrame(scores)
+    return int(scores.loc[scores['Silhouette'].idxmax(), 'K']), scores
+
+
+def name_clusters(centers, profiles=ROLE_PROFILES):
+    # centers : centroïdes standardisés (une ligne par cluster, une colonne par indicateur).
+    # Le rôle d'un cluster est le profil le plus marqué par rapport à ses autres profils ;
+    # un rôle attribué à plusieurs clusters est numéroté ("Finisher 2").
+    names = {}
+    if 'Min' in centers.columns and len(centers) > 1:
+        lowest = centers['Min'].idxmin()
+        if centers.loc[lowest, 'Min'] < RESERVE_MAX_MINUTES:
+            names[lowest] = RESERVE_ROLE
+
+    profiles = {role: [f for f in features if f in centers.columns] for role, features in profiles.items()}
+    profiles = {role: features for role, features in profiles.items() if features}
+    scores = pd.DataFrame({role: centers[features].mean(axis=1) for role, features in profiles.items()})
+    relative = scores.sub(scores.mean(axis=1), axis=0).drop(index=list(names))
+
+    best = relative.idxmax(axis=1)
+    strength = relative.max(axis=1)
+    for role, clusters in best.groupby(best):
+        ranked = strength[clusters.index].sort_values(ascending=False).index
+        for rank, cluster in enumerate(ranked, start=1):
+            names[cluster] = role if rank == 1 else f"{role} {rank}"
+    return {cluster: names[cluster] for cluster in sorted(names)}
+
+
+def feature_frame(df, features):
+    # Indicateurs sous leur nom brut ("Gls"), que df utilise les noms bruts ou ceux du
+    # dashboard ("Buts", voir players_data.COLUMN_NAMES)
+    columns = {feature: feature if feature in df.columns else COLUMN_NAMES.get(feature, feature) for feature in features}
+    return pd.DataFrame({feature: df[column] for feature, column in columns.items()}).fillna(0).astype('float64')
+
+
+def data_hash(df, features):
+    digest = hashlib.sha256('|'.join(features).encode())
+    digest.update(np.ascontiguousarray(feature_frame(df, features).to_numpy()).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class RoleModel:
+    def __init__(self, features, scaler, model, k_scores=None, pca=None, requested_clusters=None, data_hash=None):
+        self.features = list(features)
+        self.scaler = scaler
+        self.model = model
+        self.k_scores = k_scores
+        self.pca = pca
+        self.requested_clusters = requested_clusters
+        self.data_hash = data_hash
+        self.version = MODEL_VERSION
+
+        # Numérotation stable des clusters : par temps de jeu moyen décroissant
+        centers = model.cluster_centers_
+        order_column = self.features.index('Min') if 'Min' in self.features else None
+        volume = centers[:, order_column] if order_column is not None else np.linalg.norm(centers, axis=1)
+        order = np.argsort(-volume, kind='stable')
+        self._relabel = np.empty(len(order), dtype=np.int64)
+        self._relabel[order] = np.arange(len(order))
+
+        self.centers = pd.DataFrame(centers[order], columns=self.features)
+        self.names = name_clusters(self.centers)
+        self._role_array = np.array([self.names[cluster] for cluster in range(len(order))], dtype=object)
+
+    @property
+    def n_clusters(self):
+        return len(self.names)
+
+    def transform(self, df):
+        return self.scaler.transform(feature_frame(df, self.features))
+
+    def predict(self, df, X=None):
+        # Centroïde le plus proche calculé directement (même règle que KMeans.predict,
+        # sans la validation de scikit-learn à chaque appel)
+        X = self.transform(df) if X is None else X
+        centers = self.model.cluster_centers_
+        distances = (X ** 2).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers ** 2).sum(axis=1)
+        return self._relabel[distances.argmin(axis=1)]
+
+    def project(self, df, X=None):
+        # Coordonnées (PC1, PC2) dans la projection PCA ajustée avec le modèle
+        X = self.transform(df) if X is None else X
+        return self.pca.transform(X)
+
+    def role_names(self, clusters):
+        return self._role_array[np.asarray(clusters)]
+
+    def matches(self, df, features, n_clusters=None):
+        return (
+            getattr(self, 'version', None) == MODEL_VERSION
+            and self.features == list(features)
+            and self.requested_clusters == n_clusters
+            and self.data_hash == data_hash(df, features)
+        )
+
+    def save(self, path):
+        import joblib
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def load_role_model(path=MODEL_PATH):
+    import joblib
+    return joblib.load(path)
+
+
+def saved_role_model(path=MODEL_PATH):
+    # Modèle sauvegardé utilisable tel quel (même version du code) ; None s'il est absent,
+    # illisible ou écrit par une autre version
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        model = load_role_model(path)
+    except MODEL_LOAD_ERRORS:
+        return None
+    if not isinstance(model, RoleModel) or getattr(model, 'version', None) != MODEL_VERSION:
+        return None
+    return model
+
+
+def stored_role_model(path, df, features=ROLE_FEATURES, n_clusters=None):
+    # Modèle sauvegardé s'il a été ajusté sur les mêmes données, avec les mêmes
+    # indicateurs et la même version ; None sinon (absent, périmé ou illisible)
+    model = saved_role_model(path)
+    if model is None or not model.matches(df, features, n_clusters):
+        return None
+    return model
+
+
+def fit_role_model(df, features=ROLE_FEATURES, n_clusters=None, sample_size=SAMPLE_SIZE):
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+
+    requested_clusters = n_clusters
+    scaler = StandardScaler().fit(feature_frame(df, features))
+    X = scaler.transform(feature_frame(df, features))
+
+    k_scores = None
+    if n_clusters is None:
+        n_clusters, k_scores = choose_k(X, sample_size=sample_size)
+
+    model = make_kmeans(n_clusters, len(X)).fit(X)
+    pca = PCA(n_components=2).fit(X)
+    return RoleModel(features, scaler, model, k_scores, pca, requested_clusters, data_hash(df, features))
+
+
+def role_model(df, features=ROLE_FEATURES, n_clusters=None, path=MODEL_PATH, refit=False):
+    # Recharge le modèle sauvegardé si les données n'ont pas changé, sinon ajuste et
+    # sauvegarde. Renvoie (modèle, True si rechargé)
+    model = None if refit else stored_role_model(path, df, features, n_clusters)
+    if model is not None:
+        return model, True
+    model = fit_role_model(df, features, n_clusters)
+    if path:
+        model.save(path)
+    return model, False
+
+
+_default_models = {}
+
+
+def assign_role(players, model=None, path=MODEL_PATH):
+    # Noms de rôles des lignes de players (une par ligne, dans l'ordre). Sans model, le
+    # modèle sauvegardé dans path est chargé une fois, puis rechargé s'il est remplacé.
+    if model is None:
+        stamp = os.path.getmtime(path)
+        if _default_models.get(path, (None,))[0] != stamp:
+            _default_models[path] = (stamp, load_role_model(path))
+        model = _default_models[path][1]
+    if len(players) == 0:
+        return np.empty(0, dtype=object)
+    return model.role_names(model.predict(players))
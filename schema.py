@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Schéma compact du frame joueurs, appliqué au chargement par les deux scripts.
+# Les clés sont les noms bruts du CSV ; prepare_dashboard_frame renomme les colonnes,
+# apply_schema reçoit alors le dictionnaire de renommage.
+
+SCHEMA = {
+    'Rk': 'int32',
+    'Nation': 'category',
+    'Pos': 'category',
+    'Squad': 'category',
+    'Comp': 'category',
+    'Age': 'int16',
+    'Born': 'int16',
+    'MP': 'int16',
+    'Starts': 'int16',
+    'Min': 'int16',
+    '90s': 'float32',
+    'Gls': 'int16',
+    'Ast': 'int16',
+    'G+A': 'int16',
+    'G-PK': 'int16',
+    'PK': 'int16',
+    'PKatt': 'int16',
+    'CrdY': 'int16',
+    'CrdR': 'int16',
+    'xG': 'float32',
+    'npxG': 'float32',
+    'xAG': 'float32',
+    'npxG+xAG': 'float32',
+    'PrgC': 'int16',
+    'PrgP': 'int16',
+    'PrgR': 'int16',
+    'Gls_90': 'float32',
+    'Ast_90': 'float32',
+    'G+A_90': 'float32',
+    'G-PK_90': 'float32',
+    'G+A-PK_90': 'float32',
+    'xG_90': 'float32',
+    'xAG_90': 'float32',
+    'xG+xAG_90': 'float32',
+    'npxG_90': 'float32',
+    'npxG+xAG_90': 'float32',
+    'Buts par Match': 'float32',
+    'Passes Déc par Match': 'float32',
+    'Minutes par Match': 'float32'
+}
+
+
+def _integer_dtype(series, dtype):
+    # Valeurs manquantes (frame brut) : float32 ; valeurs hors bornes : entier plus large
+    if series.isna().any():
+        return 'float32'
+    info = np.iinfo(dtype)
+    while series.min() < info.min or series.max() > info.max:
+        dtype = {'int16': 'int32', 'int32': 'int64'}[str(info.dtype)]
+        info = np.iinfo(dtype)
+    return dtype
+
+
+def apply_schema(df, column_names=None):
+    column_names = column_names or {}
+    dtypes = {}
+    for raw_name, dtype in SCHEMA.items():
+        column = column_names.get(raw_name, raw_name)
+        if column not in df.columns:
+            continue
+        if dtype.startswith('int'):
+            dtype = _integer_dtype(df[column], dtype)
+        dtypes[column] = dtype
+    return df.astype(dtypes)
+
+
+def memory_report(df):
+    # Compare la mémoire réelle du frame à celle du même frame en float64/int64 et en
+    # chaînes Python (types obtenus avec un simple pd.read_csv)
+    compact = df.memory_usage(deep=True, index=False)
+    wide = pd.Series(0, index=compact.index, dtype='int64')
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            wide[column] = df[column].astype(object).memory_usage(deep=True, index=False)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            wide[column] = len(df) * 8
+        else:
+            wide[column] = compact[column]
+
+    before, after = int(wide.sum()), int(compact.sum())
+    return {
+        'before_mb': before / 1e6,
+        'after_mb': after / 1e6,
+        'saved_pct': 100 * (before - after) / before if before else 0.0
+    }
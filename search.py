@@ -0,0 +1,129 @@
+import re
+import unicodedata
+
+import numpy as np
+
+# Recherche approximative de joueurs, clubs et ligues. Les textes sont normalisés (minuscules,
+# sans accents) et découpés en mots ; chaque mot du vocabulaire est indexé par ses trigrammes
+# et par ordre alphabétique (préfixes). Une requête ne touche que les mots qui partagent des
+# trigrammes avec elle, puis les lignes qui contiennent ces mots : les scores ne sont tenus
+# que pour ces lignes candidates, le coût dépend de leur nombre et non de celui des lignes.
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Lettres sans décomposition Unicode (NFKD ne les ramène pas à une lettre de base)
+SPECIAL_LETTERS = str.maketrans({'ø': 'o', 'ß': 'ss', 'ł': 'l', 'đ': 'd', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'þ': 'th'})
+
+# Similarité minimale (coefficient de Dice sur les trigrammes) pour qu'un mot corresponde
+MIN_SIMILARITY = 0.4
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKD', str(text).lower().translate(SPECIAL_LETTERS))
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, documents):
+        # documents : un texte par ligne (par ex. "Joueur Équipe Ligue"), dans l'ordre des lignes
+        documents = list(documents)
+        vocabulary = {}
+        token_ids, doc_ids = [], []
+        for doc, text in enumerate(documents):
+            for token in set(tokenize(text)):
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc)
+
+        self.size = len(documents)
+        self.tokens = np.array(list(vocabulary), dtype=object)
+        self._token_chars = np.array([len(token) for token in self.tokens])
+        self._token_grams = np.array([len(trigrams(token)) for token in self.tokens])
+
+        # Lignes de chaque mot (format CSR)
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        order = np.argsort(token_ids, kind='stable')
+        self._docs = np.asarray(doc_ids, dtype=np.int64)[order]
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(token_ids, minlength=len(vocabulary)))])
+
+        grams = {}
+        for token_id, token in enumerate(self.tokens):
+            for gram in trigrams(token):
+                grams.setdefault(gram, []).append(token_id)
+        self._grams = {gram: np.array(ids) for gram, ids in grams.items()}
+
+        self._alphabetical = np.argsort(self.tokens, kind='stable')
+        self._sorted_tokens = self.tokens[self._alphabetical]
+
+    def _token_scores(self, token):
+        # Mots du vocabulaire proches de token : 1 pour le mot exact, ~0.8-1 pour un mot qui
+        # commence par token, Dice sur les trigrammes pour les fautes de frappe
+        query_grams = trigrams(token)
+        postings = [self._grams[gram] for gram in query_grams if gram in self._grams]
+        if postings:
+            matched, shared = np.unique(np.concatenate(postings), return_counts=True)
+            scores = 2 * shared / (len(query_grams) + self._token_grams[matched])
+            keep = scores >= MIN_SIMILARITY
+            matched, scores = matched[keep], scores[keep]
+        else:
+            matched, scores = np.empty(0, dtype=np.int64), np.empty(0)
+
+        start = np.searchsorted(self._sorted_tokens, token, side='left')
+        stop = np.searchsorted(self._sorted_tokens, token + '\uffff', side='left')
+        prefixed = self._alphabetical[start:stop]
+        prefix_scores = 0.8 + 0.2 * len(token) / self._token_chars[prefixed]
+
+        return np.concatenate([matched, prefixed]), np.concatenate([scores, prefix_scores])
+
+    def _doc_scores(self, token):
+        # Lignes contenant un mot proche de token (triées) et meilleur score de chacune
+        token_ids, scores = self._token_scores(token)
+        starts = self._offsets[token_ids]
+        counts = self._offsets[token_ids + 1] - starts
+        # Positions de toutes les listes de lignes concaténées, sans boucle Python
+        ends = np.cumsum(counts)
+        docs = self._docs[np.repeat(starts - (ends - counts), counts) + np.arange(counts.sum())]
+        doc_scores = np.repeat(scores, counts)
+
+        order = np.lexsort((-doc_scores, docs))
+        docs, doc_scores = docs[order], doc_scores[order]
+        first = np.ones(len(docs), dtype=bool)
+        first[1:] = docs[1:] != docs[:-1]
+        return docs[first], doc_scores[first]
+
+    def search(self, query, limit=None, rows=None):
+        # Renvoie les lignes qui correspondent à tous les mots de la requête, triées par
+        # pertinence décroissante, et leurs scores. rows (triées par ordre croissant, par
+        # ex. les lignes d'un filtre) restreint les résultats à ces lignes.
+        tokens = tokenize(query)
+        if not tokens or not self.size:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        matched, total = None, None
+        for token in dict.fromkeys(tokens):
+            docs, doc_scores = self._doc_scores(token)
+            if matched is None:
+                matched, total = docs, doc_scores
+            else:
+                matched, left, right = np.intersect1d(matched, docs, assume_unique=True, return_indices=True)
+                total = total[left] + doc_scores[right]
+
+        if rows is not None:
+            # Recherche dichotomique des seules lignes candidates dans rows
+            position = np.searchsorted(rows, matched)
+            keep = position < len(rows)
+            keep[keep] = rows[position[keep]] == matched[keep]
+            matched, total = matched[keep], total[keep]
+
+        order = np.argsort(-total, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return matched[order], total[order] / len(tokens)
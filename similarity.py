@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+# Recherche de joueurs similaires ("trouver des joueurs comme X") sur les statistiques
+# par 90 minutes standardisées. L'index (KD-tree) est construit une fois par jeu de
+# données ; une requête ne parcourt que les voisins proches, pas toute la population.
+
+PER90_COLUMNS = [
+    'Performance Buts', 'Performance Passes', 'Performance Buts sans Pénalty',
+    'Performance xG', 'Performance xAG', 'Performance npxG'
+]
+
+# Totaux ramenés à 90 minutes au moment de la construction de l'index
+PER90_TOTALS = {
+    'Courses Progressives /90': 'Courses Progressives',
+    'Passes Progressives /90': 'Passes Progressives',
+    'Conduites Progressives /90': 'Conduites Progressives'
+}
+
+SIMILARITY_COLUMNS = PER90_COLUMNS + list(PER90_TOTALS)
+
+# Les taux par 90 minutes d'un joueur qui a très peu joué sont trop bruités pour servir de
+# voisin : seuls les joueurs au-dessus de ce seuil sont indexés (tous restent interrogeables)
+MIN_MINUTES = 450
+
+# En dessous de ce nombre de candidats, une requête restreinte calcule directement les
+# distances sur le sous-ensemble plutôt que d'élargir la recherche dans l'arbre
+BRUTE_FORCE_LIMIT = 2000
+
+
+def similarity_features(df):
+    features = pd.DataFrame(index=df.index)
+    for column in PER90_COLUMNS:
+        features[column] = df[column]
+    nineties = df['Matchs 90'].replace(0, np.nan)
+    for column, total in PER90_TOTALS.items():
+        features[column] = df[total] / nineties
+    return features.fillna(0).astype('float32')
+
+
+class SimilarityIndex:
+    def __init__(self, df, min_minutes=MIN_MINUTES, key='Joueur'):
+        # key : colonne identifiant un joueur, dont les autres lignes sont exclues des résultats
+        self.size = len(df)
+        self._names = pd.factorize(df[key])[0]
+        features = similarity_features(df).to_numpy()
+
+        in_pool = df['Minutes'].to_numpy() >= min_minutes
+        if not in_pool.any():
+            in_pool[:] = True
+        self._pool = np.flatnonzero(in_pool)
+        self._in_pool = in_pool
+
+        self._scaler = StandardScaler().fit(features[self._pool])
+        self._points = self._scaler.transform(features).astype('float32')
+        self._tree = NearestNeighbors(algorithm='kd_tree').fit(self._points[self._pool])
+
+    def _brute_force(self, query, rows, k):
+        distances = np.sqrt(((self._points[rows] - query) ** 2).sum(axis=1))
+        nearest = np.argsort(distances, kind='stable')[:k]
+        return rows[nearest], distances[nearest]
+
+    def similar(self, row, k=10, candidates=None):
+        # Renvoie les positions (iloc) des k joueurs les plus proches de la ligne row et
+        # leurs distances, en excluant les autres lignes du même joueur. candidates
+        # restreint la recherche à ces positions (ligue, poste, âge...).
+        query = self._points[row]
+        allowed = self._in_pool & (self._names != self._names[row])
+        if candidates is not None:
+            restricted = np.zeros(self.size, dtype=bool)
+            restricted[candidates] = True
+            allowed &= restricted
+            if allowed.sum() <= BRUTE_FORCE_LIMIT:
+                return self._brute_force(query, np.flatnonzero(allowed), k)
+
+        n_neighbors = min(len(self._pool), 4 * k)
+        while True:
+            distances, positions = self._tree.kneighbors(query[None, :], n_neighbors=n_neighbors)
+            rows = self._pool[positions[0]]
+            keep = allowed[rows]
+            if keep.sum() >= k or n_neighbors == len(self._pool):
+                return rows[keep][:k], distances[0][keep][:k]
+            n_neighbors = min(len(self._pool), 4 * n_neighbors)
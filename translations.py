@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Tables de traduction partagées. Elles sont appliquées sur les catégories distinctes
+# d'une colonne (et non ligne par ligne), le coût dépend donc du nombre de valeurs uniques.
+
+POSITION_CODES = {
+    'GK': 'GB',
+    'DF': 'DF',
+    'MF': 'MI',
+    'FW': 'AT'
+}
+
+NATION_NAMES = {
+    'es ESP': 'Espagne', 'fr FRA': 'France', 'de GER': 'Allemagne',
+    'it ITA': 'Italie', 'eng ENG': 'Angleterre', 'br BRA': 'Brésil',
+    'ar ARG': 'Argentine', 'pt POR': 'Portugal', 'nl NED': 'Pays-Bas',
+    'dk DEN': 'Danemark', 'be BEL': 'Belgique', "ci CIV": "Côte d'Ivoire",
+    'ma MAR': 'Maroc', 'ch SUI': 'Suisse', 'se SWE': 'Suède',
+    'hr CRO': 'Croatie', 'at AUT': 'Autriche', 'ng NGA': 'Nigeria',
+    'us USA': 'États-Unis', 'sct SCO': 'Écosse', 'wal WAL': 'Pays de Galles',
+    'sn SEN': 'Sénégal', 'cm CMR': 'Cameroun', 'gh GHA': 'Ghana',
+    'co COL': 'Colombie', 'dz ALG': 'Algérie', 'rs SRB': 'Serbie',
+    'jp JPN': 'Japon', 'kr KOR': 'Corée du Sud', 'tn TUN': 'Tunisie',
+    'uy URU': 'Uruguay', 'tr TUR': 'Turquie', 'pl POL': 'Pologne',
+    'cz CZE': 'République Tchèque', 'mx MEX': 'Mexique', 'eg EGY': 'Égypte',
+    'nir NIR': 'Irlande du Nord', 'ie IRL': 'Irlande', 'no NOR': 'Norvège',
+    'fi FIN': 'Finlande', 'ro ROU': 'Roumanie', 'gr GRE': 'Grèce',
+    'hu HUN': 'Hongrie', 'si SVN': 'Slovénie', 'sk SVK': 'Slovaquie',
+    'ua UKR': 'Ukraine', 'gn GUI': 'Guinée', 'ga GAB': 'Gabon',
+    'ml MLI': 'Mali', 'ao ANG': 'Angola', 'za RSA': 'Afrique du Sud',
+    've VEN': 'Venezuela', 'ec ECU': 'Équateur', 'py PAR': 'Paraguay',
+    'xk KVX': 'Kosovo', 'al ALB': 'Albanie', 'ba BIH': 'Bosnie-Herzégovine',
+    'mk MKD': 'Macédoine du Nord', 'me MNE': 'Monténégro', 'bg BUL': 'Bulgarie',
+    'is ISL': 'Islande', 'lu LUX': 'Luxembourg', 'cy CYP': 'Chypre',
+    'mt MLT': 'Malte', 'md MDA': 'Moldavie', 'ge GEO': 'Géorgie',
+    'am ARM': 'Arménie', 'az AZE': 'Azerbaïdjan', 'kz KAZ': 'Kazakhstan',
+    'au AUS': 'Australie', 'nz NZL': 'Nouvelle-Zélande', 'ca CAN': 'Canada',
+    'il ISR': 'Israël', 'iq IRQ': 'Irak', 'ir IRN': 'Iran',
+    'sa KSA': 'Arabie Saoudite', 'sy SYR': 'Syrie', 'lb LBN': 'Liban',
+    'jo JOR': 'Jordanie', 'ps PSE': 'Palestine', 'ae UAE': 'Émirats Arabes Unis'
+}
+
+
+def translate_position(pos):
+    # Gère n'importe quelle combinaison "MF,FW,DF" en traduisant chaque code
+    return ','.join(POSITION_CODES.get(code.strip(), code.strip()) for code in pos.split(','))
+
+
+def translate_nation(nation):
+    return NATION_NAMES.get(nation, nation)
+
+
+def translate_categories(series, translate):
+    categorical = series.astype('category')
+    categories = categorical.cat.categories
+    translated = pd.Index([translate(value) for value in categories])
+
+    if translated.is_unique:
+        return categorical.cat.rename_categories(translated)
+
+    # Deux valeurs brutes donnent la même traduction : on fusionne les catégories
+    codes = categorical.cat.codes.to_numpy()
+    merged_categories = translated.unique()
+    remap = merged_categories.get_indexer(translated)
+    merged = pd.Categorical.from_codes(np.where(codes >= 0, remap[codes], -1), categories=merged_categories)
+    return pd.Series(merged, index=series.index, name=series.name)
+
+
+def translate_positions(series):
+    return translate_categories(series, translate_position)
+
+
+def translate_nations(series):
+    return translate_categories(series, translate_nation)